@@ -0,0 +1,32 @@
+import os
+from typing import Dict
+from app.core import config
+from app.utils.sqlite_cache import SQLiteCache
+
+# Texto por página de cada PDF, por hash SHA-256 del archivo y versión del extractor
+paginas = SQLiteCache(
+    name="paginas",
+    path=os.path.join(config.CACHE_DIR, "paginas.sqlite"),
+    max_bytes=config.PAGE_CACHE_MAX_BYTES
+)
+
+# Arreglo JSON de artículos por bloque de páginas, por modelo, versión del prompt y hash del texto limpio
+separacion = SQLiteCache(
+    name="separacion",
+    path=os.path.join(config.CACHE_DIR, "separacion.sqlite"),
+    max_entries=config.SEPARATION_CACHE_MAX_ENTRIES
+)
+
+# Respuestas validadas del análisis de derechos, por modelo, opciones y prompt
+respuestas_llm = SQLiteCache(
+    name="respuestas_llm",
+    path=os.path.join(config.CACHE_DIR, "respuestas_llm.sqlite"),
+    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.LLM_CACHE_TTL_DAYS * 24 * 3600
+)
+
+CACHES: Dict[str, SQLiteCache] = {
+    paginas.name: paginas,
+    separacion.name: separacion,
+    respuestas_llm.name: respuestas_llm
+}
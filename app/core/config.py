@@ -1,7 +1,64 @@
+import os
+
 NEWS_PATH = "noticias"
 NEWS_JSON_FILE = "resultados/news.json"
 OLLAMA_API_URL = "http://localhost:11434/api/generate"
 OLLAMA_HOST = "localhost"
 OLLAMA_PORT = 11434
 MODEL_NAME = "gemma2:9b"
-CSV_FILE = "resultados_derechos.csv"
\ No newline at end of file
+CSV_FILE = "resultados_derechos.csv"
+
+# Noticias analizadas en paralelo por el LLM (alinear con OLLAMA_NUM_PARALLEL)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+
+# Cliente HTTP compartido hacia Ollama
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", f"http://{OLLAMA_HOST}:{OLLAMA_PORT}")
+OLLAMA_VISION_MODEL = "llama3.2-vision"
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "8"))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "120"))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))
+
+# Bloques de páginas enviados en paralelo al modelo de separación de noticias
+SEPARATION_WORKERS = int(os.getenv("SEPARATION_WORKERS", "2"))
+
+# Servidores Tika locales levantados al iniciar la app (puertos consecutivos)
+TIKA_HOST = os.getenv("TIKA_HOST", "localhost")
+TIKA_BASE_PORT = int(os.getenv("TIKA_BASE_PORT", "9998"))
+TIKA_INSTANCES = int(os.getenv("TIKA_INSTANCES", "2"))
+TIKA_STARTUP_TIMEOUT = float(os.getenv("TIKA_STARTUP_TIMEOUT", "60"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "4"))
+
+# Cachés persistentes en disco
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_MB", "512")) * 1024 * 1024
+SEPARATION_CACHE_MAX_ENTRIES = int(os.getenv("SEPARATION_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+
+# Catálogo de derechos en memoria
+RIGHTS_CACHE_TTL_SECONDS = int(os.getenv("RIGHTS_CACHE_TTL_SECONDS", "300"))
+
+# Filas acumuladas por el BulkWriter antes de enviarlas a la base de datos
+DB_BULK_BATCH_SIZE = int(os.getenv("DB_BULK_BATCH_SIZE", "500"))
+
+# Trabajos del pipeline de minado/análisis (cola en proceso, estado en SQLite)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(CACHE_DIR, "jobs.sqlite"))
+JOBS_RETENTION_DAYS = float(os.getenv("JOBS_RETENTION_DAYS", "7"))
+
+# Progreso hacia los clientes: entregas por segundo y mensajes en cola por suscriptor
+PROGRESS_MAX_RATE = float(os.getenv("PROGRESS_MAX_RATE", "4"))
+PROGRESS_QUEUE_SIZE = int(os.getenv("PROGRESS_QUEUE_SIZE", "100"))
+
+# Salida estructurada: JSON schema en `format` de Ollama y tope de tokens por respuesta
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "false").lower() == "true"
+LLM_CHARS_PER_TOKEN = float(os.getenv("LLM_CHARS_PER_TOKEN", "3"))
+LLM_NUM_PREDICT_MARGIN = float(os.getenv("LLM_NUM_PREDICT_MARGIN", "1.5"))
+
+# Empaquetado de varias noticias de la misma fecha en un solo prompt de análisis
+ANALYSIS_PACKING = os.getenv("ANALYSIS_PACKING", "false").lower() == "true"
+ANALYSIS_PACK_TOKEN_BUDGET = int(os.getenv("ANALYSIS_PACK_TOKEN_BUDGET", "3000"))
+ANALYSIS_PACK_MAX_ITEMS = int(os.getenv("ANALYSIS_PACK_MAX_ITEMS", "8"))
@@ -23,6 +23,30 @@ INSTRUCCIONES MUY ESTRICTAS:
 [{"derecho": "derecho", "cantidad": numero_de_noticias_relacionadas, "lugares": ["nombre_del_lugar", ...]}]
 """)
 
+PACKED_PROMPT = Template("""
+A continuación tienes ${total_noticias} noticias del día ${fecha}. Cada noticia está numerada:
+
+${lista_noticias}
+
+Tu tarea es analizar *cada noticia por separado* y clasificarla según los siguientes derechos humanos:
+${lista_derechos}
+
+Esta es la lista oficial y completa de distritos de El Salvador:
+${lista_distritos}
+
+INSTRUCCIONES MUY ESTRICTAS:
+- Para cada noticia, identifica los derechos humanos aplicables *únicamente* de la lista proporcionada.
+- Debes trabajar con cada temática de derechos humanos propoporcionada, en cada noticia.
+- Luego, extrae el lugar o lugares *exactos* donde ocurre cada noticia, *pero solo si aparece exactamente como está en la lista de distritos.*
+- No adivines lugares. No infieras lugares. No escribas nombres que no estén en el texto original de esa noticia.
+- Si no encuentras una coincidencia exacta entre la noticia y la lista de distritos, no escribas ningún lugar.
+- Si un derecho no tiene mención en una noticia, inclúyelo en esa noticia con "cantidad": 0 y "lugares": [].
+- Nunca uses valores null. Siempre incluye todas las claves: "noticia", "derechos", "derecho", "cantidad" y "lugares".
+- Devuelve exactamente un objeto por noticia, con su número en "noticia".
+- Devuélveme la respuesta exclusivamente en formato JSON (sin explicaciones ni texto adicional), con esta estructura:
+[{"noticia": numero_de_noticia, "derechos": [{"derecho": "derecho", "cantidad": 1_si_la_noticia_se_relaciona_o_0, "lugares": ["nombre_del_lugar", ...]}]}]
+""")
+
 EXTRACT_DATA_PROMPT = Template('''
 Separa el texto en cada artículo informativo que presenta, la salida DEBE ser un arreglo de JSON, donde cada item contenga una clave de "titular" y "contenido". \n
 [\n
@@ -1,278 +1,335 @@
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+from app.utils import text_helpers as TextHelpers
 
-def get_el_salvador_locations() -> List[dict]:
-    lista_distritos = [
-        "Atiquizaya, Ahuachapán Norte, Ahuachapán",
-        "El Refugio, Ahuachapán Norte, Ahuachapán",
-        "San Lorenzo, Ahuachapán Norte, Ahuachapán",
-        "Turín, Ahuachapán Norte, Ahuachapán",
-        "Ahuachapán, Ahuachapán Centro, Ahuachapán",
-        "Apaneca, Ahuachapán Centro, Ahuachapán",
-        "Concepción de Ataco, Ahuachapán Centro, Ahuachapán",
-        "Tacuba, Ahuachapán Centro, Ahuachapán",
-        "Guaymango, Ahuachapán Sur, Ahuachapán",
-        "Jujutla, Ahuachapán Sur, Ahuachapán",
-        "San Francisco Menéndez, Ahuachapán Sur, Ahuachapán",
-        "San Pedro Puxtla, Ahuachapán Sur, Ahuachapán",
-        "Dolores, Cabañas Este, Cabañas",
-        "Guacotecti, Cabañas Este, Cabañas",
-        "San Isidro, Cabañas Este, Cabañas",
-        "Sensuntepeque, Cabañas Este, Cabañas",
-        "Victoria, Cabañas Este, Cabañas",
-        "Cinquera, Cabañas Oeste, Cabañas",
-        "Ilobasco, Cabañas Oeste, Cabañas",
-        "Jutiapa, Cabañas Oeste, Cabañas",
-        "Tejutepeque, Cabañas Oeste, Cabañas",
-        "Citalá, Chalatenango Norte, Chalatenango",
-        "La Palma, Chalatenango Norte, Chalatenango",
-        "San Ignacio, Chalatenango Norte, Chalatenango",
-        "Agua Caliente, Chalatenango Centro, Chalatenango",
-        "Dulce Nombre de María, Chalatenango Centro, Chalatenango",
-        "El Paraíso, Chalatenango Centro, Chalatenango",
-        "La Reina, Chalatenango Centro, Chalatenango",
-        "Nueva Concepción, Chalatenango Centro, Chalatenango",
-        "San Fernando, Chalatenango Centro, Chalatenango",
-        "San Francisco Morazán, Chalatenango Centro, Chalatenango",
-        "San Rafael, Chalatenango Centro, Chalatenango",
-        "Santa Rita, Chalatenango Centro, Chalatenango",
-        "Tejutla, Chalatenango Centro, Chalatenango",
-        "Arcatao, Chalatenango Sur, Chalatenango",
-        "Azacualpa, Chalatenango Sur, Chalatenango",
-        "San José Cancasque, Chalatenango Sur, Chalatenango",
-        "Chalatenango, Chalatenango Sur, Chalatenango",
-        "Comalapa, Chalatenango Sur, Chalatenango",
-        "Concepción Quezaltepeque, Chalatenango Sur, Chalatenango",
-        "El Carrizal, Chalatenango Sur, Chalatenango",
-        "La Laguna, Chalatenango Sur, Chalatenango",
-        "Las Flores, Chalatenango Sur, Chalatenango",
-        "Las Vueltas, Chalatenango Sur, Chalatenango",
-        "Nombre de Jesús, Chalatenango Sur, Chalatenango",
-        "Nueva Trinidad, Chalatenango Sur, Chalatenango",
-        "Ojos de Agua, Chalatenango Sur, Chalatenango",
-        "Potonico, Chalatenango Sur, Chalatenango",
-        "San Antonio de la Cruz, Chalatenango Sur, Chalatenango",
-        "San Antonio Los Ranchos, Chalatenango Sur, Chalatenango",
-        "San Francisco Lempa, Chalatenango Sur, Chalatenango",
-        "San Isidro Labrador, Chalatenango Sur, Chalatenango",
-        "San Luis del Carmen, Chalatenango Sur, Chalatenango",
-        "San Miguel de Mercedes, Chalatenango Sur, Chalatenango",
-        "Oratorio de Concepción, Cuscatlán Norte, Cuscatlán",
-        "San Bartolomé Perulapía, Cuscatlán Norte, Cuscatlán",
-        "San José Guayabal, Cuscatlán Norte, Cuscatlán",
-        "San Pedro Perulapán, Cuscatlán Norte, Cuscatlán",
-        "Suchitoto, Cuscatlán Norte, Cuscatlán",
-        "Candelaria, Cuscatlán Sur, Cuscatlán",
-        "Cojutepeque, Cuscatlán Sur, Cuscatlán",
-        "El Carmen, Cuscatlán Sur, Cuscatlán",
-        "El Rosario, Cuscatlán Sur, Cuscatlán",
-        "Monte San Juan, Cuscatlán Sur, Cuscatlán",
-        "San Cristóbal, Cuscatlán Sur, Cuscatlán",
-        "San Rafael Cedros, Cuscatlán Sur, Cuscatlán",
-        "San Ramón, Cuscatlán Sur, Cuscatlán",
-        "Santa Cruz Analquito, Cuscatlán Sur, Cuscatlán",
-        "Santa Cruz Michapa, Cuscatlán Sur, Cuscatlán",
-        "Tenancingo, Cuscatlán Sur, Cuscatlán",
-        "Quezaltepeque, La Libertad Norte, La Libertad",
-        "San Matías, La Libertad Norte, La Libertad",
-        "San Pablo Tacachico, La Libertad Norte, La Libertad",
-        "Ciudad Arce, La Libertad Centro, La Libertad",
-        "San Juan Opico, La Libertad Centro, La Libertad",
-        "Colón, La Libertad Oeste, La Libertad",
-        "Jayaque, La Libertad Oeste, La Libertad",
-        "Sacacoyo, La Libertad Oeste, La Libertad",
-        "Talnique, La Libertad Oeste, La Libertad",
-        "Tepecoyo, La Libertad Oeste, La Libertad",
-        "Antiguo Cuscatlán, La Libertad Este, La Libertad",
-        "Huizúcar, La Libertad Este, La Libertad",
-        "Nuevo Cuscatlán, La Libertad Este, La Libertad",
-        "San José Villanueva, La Libertad Este, La Libertad",
-        "Zaragoza, La Libertad Este, La Libertad",
-        "Chiltiupán, La Libertad Costa, La Libertad",
-        "Jicalapa, La Libertad Costa, La Libertad",
-        "La Libertad, La Libertad Costa, La Libertad",
-        "Tamanique, La Libertad Costa, La Libertad",
-        "Teotepeque, La Libertad Costa, La Libertad",
-        "Comasagua, La Libertad Sur, La Libertad",
-        "Santa Tecla, La Libertad Sur, La Libertad",
-        "Cuyultitán, La Paz Oeste, La Paz",
-        "Olocuilta, La Paz Oeste, La Paz",
-        "San Francisco Chinameca, La Paz Oeste, La Paz",
-        "San Juan Talpa, La Paz Oeste, La Paz",
-        "San Luis Talpa, La Paz Oeste, La Paz",
-        "San Pedro Masahuat, La Paz Oeste, La Paz",
-        "Tapalhuaca, La Paz Oeste, La Paz",
-        "El Rosario, La Paz Centro, La Paz",
-        "Jerusalén, La Paz Centro, La Paz",
-        "Mercedes La Ceiba, La Paz Centro, La Paz",
-        "Paraíso de Osorio, La Paz Centro, La Paz",
-        "San Antonio Masahuat, La Paz Centro, La Paz",
-        "San Emigdio, La Paz Centro, La Paz",
-        "San Juan Tepezontes, La Paz Centro, La Paz",
-        "San Luis La Herradura, La Paz Centro, La Paz",
-        "San Miguel Tepezontes, La Paz Centro, La Paz",
-        "San Pedro Nonualco, La Paz Centro, La Paz",
-        "Santa María Ostuma, La Paz Centro, La Paz",
-        "Santiago Nonualco, La Paz Centro, La Paz",
-        "San Juan Nonualco, La Paz Este, La Paz",
-        "San Rafael Obrajuelo, La Paz Este, La Paz",
-        "Zacatecoluca, La Paz Este, La Paz",
-        "Anamorós, La Unión Norte, La Unión",
-        "Bolívar, La Unión Norte, La Unión",
-        "Concepción de Oriente, La Unión Norte, La Unión",
-        "El Sauce, La Unión Norte, La Unión",
-        "Lislique, La Unión Norte, La Unión",
-        "Nueva Esparta, La Unión Norte, La Unión",
-        "Pasaquina, La Unión Norte, La Unión",
-        "Polorós, La Unión Norte, La Unión",
-        "San José, La Unión Norte, La Unión",
-        "Santa Rosa de Lima, La Unión Norte, La Unión",
-        "Conchagua, La Unión Sur, La Unión",
-        "El Carmen, La Unión Sur, La Unión",
-        "Intipucá, La Unión Sur, La Unión",
-        "La Unión, La Unión Sur, La Unión",
-        "Meanguera del Golfo, La Unión Sur, La Unión",
-        "San Alejo, La Unión Sur, La Unión",
-        "Yayantique, La Unión Sur, La Unión",
-        "Yucuaiquín, La Unión Sur, La Unión",
-        "Arambala, Morazán Norte, Morazán",
-        "Cacaopera, Morazán Norte, Morazán",
-        "Corinto, Morazán Norte, Morazán",
-        "El Rosario, Morazán Norte, Morazán",
-        "Joateca, Morazán Norte, Morazán",
-        "Jocoaitique, Morazán Norte, Morazán",
-        "Meanguera, Morazán Norte, Morazán",
-        "Perquín, Morazán Norte, Morazán",
-        "San Fernando, Morazán Norte, Morazán",
-        "San Isidro, Morazán Norte, Morazán",
-        "Torola, Morazán Norte, Morazán",
-        "Chilanga, Morazán Sur, Morazán",
-        "Delicias de Concepción, Morazán Sur, Morazán",
-        "El Divisadero, Morazán Sur, Morazán",
-        "Gualococti, Morazán Sur, Morazán",
-        "Guatajiagua, Morazán Sur, Morazán",
-        "Jocoro, Morazán Sur, Morazán",
-        "Lolotiquillo, Morazán Sur, Morazán",
-        "Osicala, Morazán Sur, Morazán",
-        "San Carlos, Morazán Sur, Morazán",
-        "San Francisco Gotera, Morazán Sur, Morazán",
-        "San Simón, Morazán Sur, Morazán",
-        "Sensembra, Morazán Sur, Morazán",
-        "Sociedad, Morazán Sur, Morazán",
-        "Yamabal, Morazán Sur, Morazán",
-        "Yoloaiquín, Morazán Sur, Morazán",
-        "Carolina, San Miguel Norte, San Miguel",
-        "Chapeltique, San Miguel Norte, San Miguel",
-        "Ciudad Barrios, San Miguel Norte, San Miguel",
-        "Nuevo Edén de San Juan, San Miguel Norte, San Miguel",
-        "San Antonio, San Miguel Norte, San Miguel",
-        "San Gerardo, San Miguel Norte, San Miguel",
-        "San Luis de la Reina, San Miguel Norte, San Miguel",
-        "Sesori, San Miguel Norte, San Miguel",
-        "Chirilagua, San Miguel Centro, San Miguel",
-        "Comacarán, San Miguel Centro, San Miguel",
-        "Moncagua, San Miguel Centro, San Miguel",
-        "Quelepa, San Miguel Centro, San Miguel",
-        "San Miguel, San Miguel Centro, San Miguel",
-        "Uluazapa, San Miguel Centro, San Miguel",
-        "Chinameca, San Miguel Oeste, San Miguel",
-        "El Tránsito, San Miguel Oeste, San Miguel",
-        "Lolotique, San Miguel Oeste, San Miguel",
-        "Nueva Guadalupe, San Miguel Oeste, San Miguel",
-        "San Jorge, San Miguel Oeste, San Miguel",
-        "San Rafael Oriente, San Miguel Oeste, San Miguel",
-        "Aguilares, San Salvador Norte, San Salvador",
-        "El Paisnal, San Salvador Norte, San Salvador",
-        "Guazapa, San Salvador Norte, San Salvador",
-        "Apopa, San Salvador Oeste, San Salvador",
-        "Nejapa, San Salvador Oeste, San Salvador",
-        "Ayutuxtepeque, San Salvador Centro, San Salvador",
-        "Cuscatancingo, San Salvador Centro, San Salvador",
-        "Delgado, San Salvador Centro, San Salvador",
-        "Mejicanos, San Salvador Centro, San Salvador",
-        "San Salvador, San Salvador Centro, San Salvador",
-        "Ilopango, San Salvador Este, San Salvador",
-        "San Martín, San Salvador Este, San Salvador",
-        "Soyapango, San Salvador Este, San Salvador",
-        "Tonacatepeque, San Salvador Este, San Salvador",
-        "Panchimalco, San Salvador Sur, San Salvador",
-        "Rosario de Mora, San Salvador Sur, San Salvador",
-        "San Marcos, San Salvador Sur, San Salvador",
-        "Santiago Texacuangos, San Salvador Sur, San Salvador",
-        "Santo Tomás, San Salvador Sur, San Salvador",
-        "Apastepeque, San Vicente Norte, San Vicente",
-        "San Esteban Catarina, San Vicente Norte, San Vicente",
-        "San Ildefonso, San Vicente Norte, San Vicente",
-        "San Lorenzo, San Vicente Norte, San Vicente",
-        "San Sebastián, San Vicente Norte, San Vicente",
-        "Santa Clara, San Vicente Norte, San Vicente",
-        "Santo Domingo, San Vicente Norte, San Vicente",
-        "Guadalupe, San Vicente Sur, San Vicente",
-        "San Cayetano Istepeque, San Vicente Sur, San Vicente",
-        "San Vicente, San Vicente Sur, San Vicente",
-        "Tecoluca, San Vicente Sur, San Vicente",
-        "Tepetitán, San Vicente Sur, San Vicente",
-        "Verapaz, San Vicente Sur, San Vicente",
-        "Masahuat, Santa Ana Norte, Santa Ana",
-        "Metapán, Santa Ana Norte, Santa Ana",
-        "Santa Rosa Guachipilín, Santa Ana Norte, Santa Ana",
-        "Texistepeque, Santa Ana Norte, Santa Ana",
-        "Santa Ana, Santa Ana Centro, Santa Ana",
-        "Coatepeque, Santa Ana Este, Santa Ana",
-        "El Congo, Santa Ana Este, Santa Ana",
-        "Candelaria de la Frontera, Santa Ana Oeste, Santa Ana",
-        "Chalchuapa, Santa Ana Oeste, Santa Ana",
-        "El Porvenir, Santa Ana Oeste, Santa Ana",
-        "San Antonio Pajonal, Santa Ana Oeste, Santa Ana",
-        "San Sebastián Salitrillo, Santa Ana Oeste, Santa Ana",
-        "Santiago de la Frontera, Santa Ana Oeste, Santa Ana",
-        "Juayúa, Sonsonate Norte, Sonsonate",
-        "Nahuizalco, Sonsonate Norte, Sonsonate",
-        "Salcoatitán, Sonsonate Norte, Sonsonate",
-        "Santa Catarina Masahuat, Sonsonate Norte, Sonsonate",
-        "Nahulingo, Sonsonate Centro, Sonsonate",
-        "San Antonio del Monte, Sonsonate Centro, Sonsonate",
-        "Santo Domingo de Guzmán, Sonsonate Centro, Sonsonate",
-        "Sonsonate, Sonsonate Centro, Sonsonate",
-        "Sonzacate, Sonsonate Centro, Sonsonate",
-        "Armenia, Sonsonate Este, Sonsonate",
-        "Caluco, Sonsonate Este, Sonsonate",
-        "Cuisnahuat, Sonsonate Este, Sonsonate",
-        "Izalco, Sonsonate Este, Sonsonate",
-        "San Julián, Sonsonate Este, Sonsonate",
-        "Santa Isabel Ishuatán, Sonsonate Este, Sonsonate",
-        "Acajutla, Sonsonate Oeste, Sonsonate",
-        "Alegría, Usulután Norte, Sonsonate",
-        "Berlín, Usulután Norte, Sonsonate",
-        "El Triunfo, Usulután Norte, Sonsonate",
-        "Estanzuelas, Usulután Norte, Sonsonate",
-        "Jucuapa, Usulután Norte, Sonsonate",
-        "Mercedes Umaña, Usulután Norte, Sonsonate",
-        "Nueva Granada, Usulután Norte, Sonsonate",
-        "San Buenaventura, Usulután Norte, Sonsonate",
-        "Santiago de María, Usulután Norte, Sonsonate",
-        "California, Usulután Este, Sonsonate",
-        "Concepción Batres, Usulután Este, Sonsonate",
-        "Ereguayquín, Usulután Este, Sonsonate",
-        "Jucuarán, Usulután Este, Sonsonate",
-        "Ozatlán, Usulután Este, Sonsonate",
-        "San Dionisio, Usulután Este, Sonsonate",
-        "Santa Elena, Usulután Este, Sonsonate",
-        "Santa María, Usulután Este, Sonsonate",
-        "Tecapán, Usulután Este, Sonsonate",
-        "Usulután, Usulután Este, Sonsonate",
-        "Jiquilisco, Usulután Oeste, Sonsonate",
-        "Puerto El Triunfo, Usulután Oeste, Sonsonate",
-        "San Agustín, Usulután Oeste, Sonsonate",
-        "San Francisco Javier, Usulután Oeste, Sonsonate"
-    ]
+# "Distrito, Municipio, Departamento"
+_LISTA_DISTRITOS = (
+    "Atiquizaya, Ahuachapán Norte, Ahuachapán",
+    "El Refugio, Ahuachapán Norte, Ahuachapán",
+    "San Lorenzo, Ahuachapán Norte, Ahuachapán",
+    "Turín, Ahuachapán Norte, Ahuachapán",
+    "Ahuachapán, Ahuachapán Centro, Ahuachapán",
+    "Apaneca, Ahuachapán Centro, Ahuachapán",
+    "Concepción de Ataco, Ahuachapán Centro, Ahuachapán",
+    "Tacuba, Ahuachapán Centro, Ahuachapán",
+    "Guaymango, Ahuachapán Sur, Ahuachapán",
+    "Jujutla, Ahuachapán Sur, Ahuachapán",
+    "San Francisco Menéndez, Ahuachapán Sur, Ahuachapán",
+    "San Pedro Puxtla, Ahuachapán Sur, Ahuachapán",
+    "Dolores, Cabañas Este, Cabañas",
+    "Guacotecti, Cabañas Este, Cabañas",
+    "San Isidro, Cabañas Este, Cabañas",
+    "Sensuntepeque, Cabañas Este, Cabañas",
+    "Victoria, Cabañas Este, Cabañas",
+    "Cinquera, Cabañas Oeste, Cabañas",
+    "Ilobasco, Cabañas Oeste, Cabañas",
+    "Jutiapa, Cabañas Oeste, Cabañas",
+    "Tejutepeque, Cabañas Oeste, Cabañas",
+    "Citalá, Chalatenango Norte, Chalatenango",
+    "La Palma, Chalatenango Norte, Chalatenango",
+    "San Ignacio, Chalatenango Norte, Chalatenango",
+    "Agua Caliente, Chalatenango Centro, Chalatenango",
+    "Dulce Nombre de María, Chalatenango Centro, Chalatenango",
+    "El Paraíso, Chalatenango Centro, Chalatenango",
+    "La Reina, Chalatenango Centro, Chalatenango",
+    "Nueva Concepción, Chalatenango Centro, Chalatenango",
+    "San Fernando, Chalatenango Centro, Chalatenango",
+    "San Francisco Morazán, Chalatenango Centro, Chalatenango",
+    "San Rafael, Chalatenango Centro, Chalatenango",
+    "Santa Rita, Chalatenango Centro, Chalatenango",
+    "Tejutla, Chalatenango Centro, Chalatenango",
+    "Arcatao, Chalatenango Sur, Chalatenango",
+    "Azacualpa, Chalatenango Sur, Chalatenango",
+    "San José Cancasque, Chalatenango Sur, Chalatenango",
+    "Chalatenango, Chalatenango Sur, Chalatenango",
+    "Comalapa, Chalatenango Sur, Chalatenango",
+    "Concepción Quezaltepeque, Chalatenango Sur, Chalatenango",
+    "El Carrizal, Chalatenango Sur, Chalatenango",
+    "La Laguna, Chalatenango Sur, Chalatenango",
+    "Las Flores, Chalatenango Sur, Chalatenango",
+    "Las Vueltas, Chalatenango Sur, Chalatenango",
+    "Nombre de Jesús, Chalatenango Sur, Chalatenango",
+    "Nueva Trinidad, Chalatenango Sur, Chalatenango",
+    "Ojos de Agua, Chalatenango Sur, Chalatenango",
+    "Potonico, Chalatenango Sur, Chalatenango",
+    "San Antonio de la Cruz, Chalatenango Sur, Chalatenango",
+    "San Antonio Los Ranchos, Chalatenango Sur, Chalatenango",
+    "San Francisco Lempa, Chalatenango Sur, Chalatenango",
+    "San Isidro Labrador, Chalatenango Sur, Chalatenango",
+    "San Luis del Carmen, Chalatenango Sur, Chalatenango",
+    "San Miguel de Mercedes, Chalatenango Sur, Chalatenango",
+    "Oratorio de Concepción, Cuscatlán Norte, Cuscatlán",
+    "San Bartolomé Perulapía, Cuscatlán Norte, Cuscatlán",
+    "San José Guayabal, Cuscatlán Norte, Cuscatlán",
+    "San Pedro Perulapán, Cuscatlán Norte, Cuscatlán",
+    "Suchitoto, Cuscatlán Norte, Cuscatlán",
+    "Candelaria, Cuscatlán Sur, Cuscatlán",
+    "Cojutepeque, Cuscatlán Sur, Cuscatlán",
+    "El Carmen, Cuscatlán Sur, Cuscatlán",
+    "El Rosario, Cuscatlán Sur, Cuscatlán",
+    "Monte San Juan, Cuscatlán Sur, Cuscatlán",
+    "San Cristóbal, Cuscatlán Sur, Cuscatlán",
+    "San Rafael Cedros, Cuscatlán Sur, Cuscatlán",
+    "San Ramón, Cuscatlán Sur, Cuscatlán",
+    "Santa Cruz Analquito, Cuscatlán Sur, Cuscatlán",
+    "Santa Cruz Michapa, Cuscatlán Sur, Cuscatlán",
+    "Tenancingo, Cuscatlán Sur, Cuscatlán",
+    "Quezaltepeque, La Libertad Norte, La Libertad",
+    "San Matías, La Libertad Norte, La Libertad",
+    "San Pablo Tacachico, La Libertad Norte, La Libertad",
+    "Ciudad Arce, La Libertad Centro, La Libertad",
+    "San Juan Opico, La Libertad Centro, La Libertad",
+    "Colón, La Libertad Oeste, La Libertad",
+    "Jayaque, La Libertad Oeste, La Libertad",
+    "Sacacoyo, La Libertad Oeste, La Libertad",
+    "Talnique, La Libertad Oeste, La Libertad",
+    "Tepecoyo, La Libertad Oeste, La Libertad",
+    "Antiguo Cuscatlán, La Libertad Este, La Libertad",
+    "Huizúcar, La Libertad Este, La Libertad",
+    "Nuevo Cuscatlán, La Libertad Este, La Libertad",
+    "San José Villanueva, La Libertad Este, La Libertad",
+    "Zaragoza, La Libertad Este, La Libertad",
+    "Chiltiupán, La Libertad Costa, La Libertad",
+    "Jicalapa, La Libertad Costa, La Libertad",
+    "La Libertad, La Libertad Costa, La Libertad",
+    "Tamanique, La Libertad Costa, La Libertad",
+    "Teotepeque, La Libertad Costa, La Libertad",
+    "Comasagua, La Libertad Sur, La Libertad",
+    "Santa Tecla, La Libertad Sur, La Libertad",
+    "Cuyultitán, La Paz Oeste, La Paz",
+    "Olocuilta, La Paz Oeste, La Paz",
+    "San Francisco Chinameca, La Paz Oeste, La Paz",
+    "San Juan Talpa, La Paz Oeste, La Paz",
+    "San Luis Talpa, La Paz Oeste, La Paz",
+    "San Pedro Masahuat, La Paz Oeste, La Paz",
+    "Tapalhuaca, La Paz Oeste, La Paz",
+    "El Rosario, La Paz Centro, La Paz",
+    "Jerusalén, La Paz Centro, La Paz",
+    "Mercedes La Ceiba, La Paz Centro, La Paz",
+    "Paraíso de Osorio, La Paz Centro, La Paz",
+    "San Antonio Masahuat, La Paz Centro, La Paz",
+    "San Emigdio, La Paz Centro, La Paz",
+    "San Juan Tepezontes, La Paz Centro, La Paz",
+    "San Luis La Herradura, La Paz Centro, La Paz",
+    "San Miguel Tepezontes, La Paz Centro, La Paz",
+    "San Pedro Nonualco, La Paz Centro, La Paz",
+    "Santa María Ostuma, La Paz Centro, La Paz",
+    "Santiago Nonualco, La Paz Centro, La Paz",
+    "San Juan Nonualco, La Paz Este, La Paz",
+    "San Rafael Obrajuelo, La Paz Este, La Paz",
+    "Zacatecoluca, La Paz Este, La Paz",
+    "Anamorós, La Unión Norte, La Unión",
+    "Bolívar, La Unión Norte, La Unión",
+    "Concepción de Oriente, La Unión Norte, La Unión",
+    "El Sauce, La Unión Norte, La Unión",
+    "Lislique, La Unión Norte, La Unión",
+    "Nueva Esparta, La Unión Norte, La Unión",
+    "Pasaquina, La Unión Norte, La Unión",
+    "Polorós, La Unión Norte, La Unión",
+    "San José, La Unión Norte, La Unión",
+    "Santa Rosa de Lima, La Unión Norte, La Unión",
+    "Conchagua, La Unión Sur, La Unión",
+    "El Carmen, La Unión Sur, La Unión",
+    "Intipucá, La Unión Sur, La Unión",
+    "La Unión, La Unión Sur, La Unión",
+    "Meanguera del Golfo, La Unión Sur, La Unión",
+    "San Alejo, La Unión Sur, La Unión",
+    "Yayantique, La Unión Sur, La Unión",
+    "Yucuaiquín, La Unión Sur, La Unión",
+    "Arambala, Morazán Norte, Morazán",
+    "Cacaopera, Morazán Norte, Morazán",
+    "Corinto, Morazán Norte, Morazán",
+    "El Rosario, Morazán Norte, Morazán",
+    "Joateca, Morazán Norte, Morazán",
+    "Jocoaitique, Morazán Norte, Morazán",
+    "Meanguera, Morazán Norte, Morazán",
+    "Perquín, Morazán Norte, Morazán",
+    "San Fernando, Morazán Norte, Morazán",
+    "San Isidro, Morazán Norte, Morazán",
+    "Torola, Morazán Norte, Morazán",
+    "Chilanga, Morazán Sur, Morazán",
+    "Delicias de Concepción, Morazán Sur, Morazán",
+    "El Divisadero, Morazán Sur, Morazán",
+    "Gualococti, Morazán Sur, Morazán",
+    "Guatajiagua, Morazán Sur, Morazán",
+    "Jocoro, Morazán Sur, Morazán",
+    "Lolotiquillo, Morazán Sur, Morazán",
+    "Osicala, Morazán Sur, Morazán",
+    "San Carlos, Morazán Sur, Morazán",
+    "San Francisco Gotera, Morazán Sur, Morazán",
+    "San Simón, Morazán Sur, Morazán",
+    "Sensembra, Morazán Sur, Morazán",
+    "Sociedad, Morazán Sur, Morazán",
+    "Yamabal, Morazán Sur, Morazán",
+    "Yoloaiquín, Morazán Sur, Morazán",
+    "Carolina, San Miguel Norte, San Miguel",
+    "Chapeltique, San Miguel Norte, San Miguel",
+    "Ciudad Barrios, San Miguel Norte, San Miguel",
+    "Nuevo Edén de San Juan, San Miguel Norte, San Miguel",
+    "San Antonio, San Miguel Norte, San Miguel",
+    "San Gerardo, San Miguel Norte, San Miguel",
+    "San Luis de la Reina, San Miguel Norte, San Miguel",
+    "Sesori, San Miguel Norte, San Miguel",
+    "Chirilagua, San Miguel Centro, San Miguel",
+    "Comacarán, San Miguel Centro, San Miguel",
+    "Moncagua, San Miguel Centro, San Miguel",
+    "Quelepa, San Miguel Centro, San Miguel",
+    "San Miguel, San Miguel Centro, San Miguel",
+    "Uluazapa, San Miguel Centro, San Miguel",
+    "Chinameca, San Miguel Oeste, San Miguel",
+    "El Tránsito, San Miguel Oeste, San Miguel",
+    "Lolotique, San Miguel Oeste, San Miguel",
+    "Nueva Guadalupe, San Miguel Oeste, San Miguel",
+    "San Jorge, San Miguel Oeste, San Miguel",
+    "San Rafael Oriente, San Miguel Oeste, San Miguel",
+    "Aguilares, San Salvador Norte, San Salvador",
+    "El Paisnal, San Salvador Norte, San Salvador",
+    "Guazapa, San Salvador Norte, San Salvador",
+    "Apopa, San Salvador Oeste, San Salvador",
+    "Nejapa, San Salvador Oeste, San Salvador",
+    "Ayutuxtepeque, San Salvador Centro, San Salvador",
+    "Cuscatancingo, San Salvador Centro, San Salvador",
+    "Delgado, San Salvador Centro, San Salvador",
+    "Mejicanos, San Salvador Centro, San Salvador",
+    "San Salvador, San Salvador Centro, San Salvador",
+    "Ilopango, San Salvador Este, San Salvador",
+    "San Martín, San Salvador Este, San Salvador",
+    "Soyapango, San Salvador Este, San Salvador",
+    "Tonacatepeque, San Salvador Este, San Salvador",
+    "Panchimalco, San Salvador Sur, San Salvador",
+    "Rosario de Mora, San Salvador Sur, San Salvador",
+    "San Marcos, San Salvador Sur, San Salvador",
+    "Santiago Texacuangos, San Salvador Sur, San Salvador",
+    "Santo Tomás, San Salvador Sur, San Salvador",
+    "Apastepeque, San Vicente Norte, San Vicente",
+    "San Esteban Catarina, San Vicente Norte, San Vicente",
+    "San Ildefonso, San Vicente Norte, San Vicente",
+    "San Lorenzo, San Vicente Norte, San Vicente",
+    "San Sebastián, San Vicente Norte, San Vicente",
+    "Santa Clara, San Vicente Norte, San Vicente",
+    "Santo Domingo, San Vicente Norte, San Vicente",
+    "Guadalupe, San Vicente Sur, San Vicente",
+    "San Cayetano Istepeque, San Vicente Sur, San Vicente",
+    "San Vicente, San Vicente Sur, San Vicente",
+    "Tecoluca, San Vicente Sur, San Vicente",
+    "Tepetitán, San Vicente Sur, San Vicente",
+    "Verapaz, San Vicente Sur, San Vicente",
+    "Masahuat, Santa Ana Norte, Santa Ana",
+    "Metapán, Santa Ana Norte, Santa Ana",
+    "Santa Rosa Guachipilín, Santa Ana Norte, Santa Ana",
+    "Texistepeque, Santa Ana Norte, Santa Ana",
+    "Santa Ana, Santa Ana Centro, Santa Ana",
+    "Coatepeque, Santa Ana Este, Santa Ana",
+    "El Congo, Santa Ana Este, Santa Ana",
+    "Candelaria de la Frontera, Santa Ana Oeste, Santa Ana",
+    "Chalchuapa, Santa Ana Oeste, Santa Ana",
+    "El Porvenir, Santa Ana Oeste, Santa Ana",
+    "San Antonio Pajonal, Santa Ana Oeste, Santa Ana",
+    "San Sebastián Salitrillo, Santa Ana Oeste, Santa Ana",
+    "Santiago de la Frontera, Santa Ana Oeste, Santa Ana",
+    "Juayúa, Sonsonate Norte, Sonsonate",
+    "Nahuizalco, Sonsonate Norte, Sonsonate",
+    "Salcoatitán, Sonsonate Norte, Sonsonate",
+    "Santa Catarina Masahuat, Sonsonate Norte, Sonsonate",
+    "Nahulingo, Sonsonate Centro, Sonsonate",
+    "San Antonio del Monte, Sonsonate Centro, Sonsonate",
+    "Santo Domingo de Guzmán, Sonsonate Centro, Sonsonate",
+    "Sonsonate, Sonsonate Centro, Sonsonate",
+    "Sonzacate, Sonsonate Centro, Sonsonate",
+    "Armenia, Sonsonate Este, Sonsonate",
+    "Caluco, Sonsonate Este, Sonsonate",
+    "Cuisnahuat, Sonsonate Este, Sonsonate",
+    "Izalco, Sonsonate Este, Sonsonate",
+    "San Julián, Sonsonate Este, Sonsonate",
+    "Santa Isabel Ishuatán, Sonsonate Este, Sonsonate",
+    "Acajutla, Sonsonate Oeste, Sonsonate",
+    "Alegría, Usulután Norte, Sonsonate",
+    "Berlín, Usulután Norte, Sonsonate",
+    "El Triunfo, Usulután Norte, Sonsonate",
+    "Estanzuelas, Usulután Norte, Sonsonate",
+    "Jucuapa, Usulután Norte, Sonsonate",
+    "Mercedes Umaña, Usulután Norte, Sonsonate",
+    "Nueva Granada, Usulután Norte, Sonsonate",
+    "San Buenaventura, Usulután Norte, Sonsonate",
+    "Santiago de María, Usulután Norte, Sonsonate",
+    "California, Usulután Este, Sonsonate",
+    "Concepción Batres, Usulután Este, Sonsonate",
+    "Ereguayquín, Usulután Este, Sonsonate",
+    "Jucuarán, Usulután Este, Sonsonate",
+    "Ozatlán, Usulután Este, Sonsonate",
+    "San Dionisio, Usulután Este, Sonsonate",
+    "Santa Elena, Usulután Este, Sonsonate",
+    "Santa María, Usulután Este, Sonsonate",
+    "Tecapán, Usulután Este, Sonsonate",
+    "Usulután, Usulután Este, Sonsonate",
+    "Jiquilisco, Usulután Oeste, Sonsonate",
+    "Puerto El Triunfo, Usulután Oeste, Sonsonate",
+    "San Agustín, Usulután Oeste, Sonsonate",
+    "San Francisco Javier, Usulután Oeste, Sonsonate"
+)
 
-    ubicaciones_es = [
-        {
-            "distrito": partes[0].strip(),
-            "municipio": partes[1].strip(),
-            "departamento": partes[2].strip()
-        }
-        for partes in (elemento.split(",") for elemento in lista_distritos)
-    ]
+class Ubicacion(NamedTuple):
+    distrito: str
+    municipio: str
+    departamento: str
+    # Claves normalizadas (minúsculas, sin tildes) para búsquedas
+    clave_distrito: str
+    clave_municipio: str
+    clave_departamento: str
 
-    return ubicaciones_es
\ No newline at end of file
+def _construir_catalogo() -> Tuple[Ubicacion, ...]:
+    ubicaciones = []
+    for elemento in _LISTA_DISTRITOS:
+        distrito, municipio, departamento = (parte.strip() for parte in elemento.split(","))
+        ubicaciones.append(Ubicacion(
+            distrito=distrito,
+            municipio=municipio,
+            departamento=departamento,
+            clave_distrito=TextHelpers.normalizar_texto(distrito),
+            clave_municipio=TextHelpers.normalizar_texto(municipio),
+            clave_departamento=TextHelpers.normalizar_texto(departamento)
+        ))
+    return tuple(ubicaciones)
+
+def _indexar(campo: str) -> Mapping[str, Tuple[Ubicacion, ...]]:
+    indice: Dict[str, List[Ubicacion]] = {}
+    for ubicacion in UBICACIONES:
+        indice.setdefault(getattr(ubicacion, campo), []).append(ubicacion)
+    return MappingProxyType({clave: tuple(valores) for clave, valores in indice.items()})
+
+# Catálogo inmutable construido una sola vez al importar
+UBICACIONES: Tuple[Ubicacion, ...] = _construir_catalogo()
+
+# Índices por clave normalizada. Un mismo nombre de distrito puede existir en
+# varios departamentos (p. ej. "San Isidro"), por eso cada entrada es una tupla.
+POR_DISTRITO = _indexar("clave_distrito")
+POR_MUNICIPIO = _indexar("clave_municipio")
+POR_DEPARTAMENTO = _indexar("clave_departamento")
+
+def buscar_distrito(distrito: str) -> Tuple[Ubicacion, ...]:
+    return POR_DISTRITO.get(TextHelpers.normalizar_texto(distrito.strip()), ())
+
+def distritos_de_municipio(municipio: str) -> Tuple[Ubicacion, ...]:
+    return POR_MUNICIPIO.get(TextHelpers.normalizar_texto(municipio.strip()), ())
+
+def distritos_de_departamento(departamento: str) -> Tuple[Ubicacion, ...]:
+    return POR_DEPARTAMENTO.get(TextHelpers.normalizar_texto(departamento.strip()), ())
+
+def departamentos_de_distrito(distrito: str) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(u.departamento for u in buscar_distrito(distrito)))
+
+@lru_cache(maxsize=None)
+def get_el_salvador_locations() -> Tuple[Mapping[str, str], ...]:
+    """
+    Vista de compatibilidad del catálogo como registros {"distrito", "municipio",
+    "departamento"}. Se construye una vez y es de solo lectura.
+    """
+    return tuple(
+        MappingProxyType({
+            "distrito": u.distrito,
+            "municipio": u.municipio,
+            "departamento": u.departamento
+        })
+        for u in UBICACIONES
+    )
@@ -1,4 +1,8 @@
 import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
@@ -10,9 +14,25 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+# executemany en un solo viaje con pyodbc; el pipeline inserta por lotes (ver BulkWriter)
+DB_FAST_EXECUTEMANY = os.getenv("DB_FAST_EXECUTEMANY", "true").lower() != "false"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() != "false"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Hilos dedicados a la base de datos para el código async (ver AsyncDB)
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
 DATABASE_URL = f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}/{DB_NAME}?driver=ODBC+Driver+17+for+SQL+Server"
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    fast_executemany=DB_FAST_EXECUTEMANY,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
@@ -22,4 +42,38 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+
+class AsyncDB:
+    """
+    Acceso a la base de datos desde código async sin bloquear el event loop.
+
+    La sesión se obtiene de get_db la primera vez que se usa y pertenece a una
+    sola tarea: cada `run(fn, ...)` ejecuta `fn(session, ...)` en el pool de
+    hilos de base de datos, de a una llamada por vez.
+    """
+
+    def __init__(self):
+        self._gen = None
+        self._session = None
+        self._lock = asyncio.Lock()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_db_executor, functools.partial(self._call, fn, *args, **kwargs))
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._session is None:
+            self._gen = get_db()
+            self._session = next(self._gen)
+        return fn(self._session, *args, **kwargs)
+
+    async def close(self):
+        async with self._lock:
+            if self._gen is None:
+                return
+            gen, self._gen, self._session = self._gen, None, None
+            await asyncio.get_running_loop().run_in_executor(_db_executor, gen.close)
@@ -1,8 +1,28 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import router as api_router
+from app.services import jobs_service as JobsService
+from app.utils import ollama_client as OllamaClient
+from app.utils import tika_pool as TikaPool
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un único cliente HTTP (pool + keep-alive) para todas las llamadas a Ollama
+    await OllamaClient.start_client()
+    # Servidores Tika levantados una sola vez y reutilizados en cada extracción
+    await asyncio.to_thread(TikaPool.start_pool)
+    # Workers del pipeline; retoman los trabajos que quedaron sin terminar
+    await JobsService.start_workers()
+    try:
+        yield
+    finally:
+        await JobsService.stop_workers()
+        await asyncio.to_thread(TikaPool.stop_pool)
+        await OllamaClient.close_client()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,8 +30,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor de paginación de /news/details, legible desde el navegador
+    expose_headers=["X-Next-Cursor"],
 )
 
 # release
 
-app.include_router(api_router)
\ No newline at end of file
+app.include_router(api_router)
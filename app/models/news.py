@@ -1,14 +1,19 @@
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, Index, NCHAR, String
 from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 from sqlalchemy.orm import relationship, declarative_base
 from .base import Base
 
 class News(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        Index("ix_news_headline_hash_news_date", "headline_hash", "news_date"),
+    )
     
     id_news = Column(UNIQUEIDENTIFIER, primary_key=True, index=True)
     headline = Column(String, nullable=False)
+    # TextHelpers.hash_titular(headline); headline es NVARCHAR(MAX) y no se puede indexar
+    headline_hash = Column(NCHAR(64), nullable=True)
     content = Column(String, nullable=False)
     news_date = Column(DateTime, nullable=False)
     
-    analyses = relationship("Analysis", back_populates="news")
\ No newline at end of file
+    analyses = relationship("Analysis", back_populates="news")
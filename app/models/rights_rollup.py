@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+from .base import Base
+
+class RightsDailyRollup(Base):
+    """
+    Conteo agregado por fecha de noticia y derecho, mantenido a medida que se
+    guardan los análisis (ver RollupRepository). places es un arreglo JSON
+    ordenado con los lugares distintos del día.
+    """
+    __tablename__ = "rights_daily_rollup"
+
+    rollup_date = Column(Date, primary_key=True)
+    id_right = Column(UNIQUEIDENTIFIER, ForeignKey("right.id_right"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    places = Column(String, nullable=False, default="[]")
+    updated_at = Column(DateTime, nullable=False)
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.analysis import Analysis
+from app.models.analysis_detail import AnalysisDetail
+from app.models.news import News
+
+# Orden de inserción que respeta las claves foráneas
+_ORDEN_TABLAS = [News.__table__, Analysis.__table__, AnalysisDetail.__table__]
+
+DEFAULT_BATCH_SIZE = 500
+
+class BulkWriter:
+    """
+    Acumula inserciones y actualizaciones del pipeline de análisis y las envía
+    en lotes: un INSERT ... executemany por tabla y un UPDATE ... executemany por
+    conjunto de columnas, en vez de una sentencia por objeto del ORM.
+
+    Los objetos agregados con `add` no se registran en la sesión; sus valores se
+    leen al hacer `flush`, así que pueden modificarse mientras tanto. `update`
+    actualiza el objeto en memoria sin marcarlo como modificado en la sesión y
+    encola un UPDATE por clave primaria (o solo lo modifica si aún no se insertó).
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or DEFAULT_BATCH_SIZE
+        self._inserts: Dict[Any, List[Any]] = defaultdict(list)
+        self._updates: Dict[Tuple[Any, Tuple[str, ...]], Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+        self._encolados = set()
+        self.rows_written = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(v) for v in self._inserts.values()) + sum(len(v) for v in self._updates.values())
+
+    def add(self, obj):
+        self.add_all([obj])
+
+    def add_all(self, objs):
+        for obj in objs:
+            self._inserts[obj.__table__].append(obj)
+            self._encolados.add(id(obj))
+        self._auto_flush()
+
+    def update(self, obj, **values):
+        if id(obj) in self._encolados:
+            # Aún pendiente de insertar: basta con modificar el objeto
+            for key, value in values.items():
+                setattr(obj, key, value)
+            return
+
+        table = obj.__table__
+        pk_column = table.primary_key.columns.values()[0]
+        pk = getattr(obj, pk_column.key)
+        for key, value in values.items():
+            set_committed_value(obj, key, value)
+        # Varias actualizaciones del mismo objeto antes del flush se combinan en una
+        columnas = tuple(sorted(values))
+        self._updates[(table, columnas)][pk] = values
+        self._auto_flush()
+
+    def flush(self):
+        for table in _ORDEN_TABLAS:
+            objs = self._inserts.pop(table, None)
+            if objs:
+                rows = [_valores(obj, table) for obj in objs]
+                self.db.execute(insert(table), rows)
+                self.rows_written += len(rows)
+        self._encolados.clear()
+
+        for (table, columnas), por_pk in list(self._updates.items()):
+            pk_column = table.primary_key.columns.values()[0]
+            sentencia = (
+                update(table)
+                .where(pk_column == bindparam("_pk"))
+                .values({c: bindparam(f"_{c}") for c in columnas})
+            )
+            rows = [
+                {"_pk": pk, **{f"_{c}": valores[c] for c in columnas}}
+                for pk, valores in por_pk.items()
+            ]
+            self.db.execute(sentencia, rows)
+            self.rows_written += len(rows)
+        self._updates.clear()
+
+    def _auto_flush(self):
+        if self.pending >= self.batch_size:
+            self.flush()
+
+def _valores(obj, table) -> Dict[str, Any]:
+    fila = {}
+    for column in table.columns:
+        valor = getattr(obj, column.key)
+        # Los default de Python (p. ej. uuid4) solo los aplica el ORM al hacer flush
+        if valor is None and column.default is not None and column.default.is_callable:
+            valor = column.default.arg(None)
+        fila[column.key] = valor
+    return fila
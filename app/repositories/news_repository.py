@@ -1,16 +1,101 @@
-from uuid import uuid4
+from bisect import bisect_right
+from collections import defaultdict
+from uuid import UUID, uuid4
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from app import models
+from app.models.analysis import Analysis
+from app.models.analysis_detail import AnalysisDetail
+from app.models.news import News
+from app.models.right import Right
+from app.utils import text_helpers as TextHelpers
+
+# Campos de detalle disponibles además de id_news
+DETAILS_FIELDS = ("headline", "content", "news_date", "filtered_analysis")
+
+# SQL Server admite como máximo 2100 parámetros por consulta
+_DETAILS_CHUNK = 1000
 
 def save_news(db: Session, headline: str, content: str, news_date: datetime):
     news = models.News(
         id_news=uuid4(),
         headline=headline,
+        headline_hash=TextHelpers.hash_titular(headline),
         content=content,
         news_date=news_date
     )
     db.add(news)
     db.commit()        
     db.refresh(news)
-    return news
\ No newline at end of file
+    return news
+
+def paginar_ids(
+    ids: Sequence[UUID],
+    after: Optional[UUID] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[UUID], Optional[UUID]]:
+    """
+    Paginación por clave sobre los ids solicitados: se ordenan una vez y la
+    página empieza después de `after`, sin OFFSET. Retorna los ids de la página
+    y el cursor de la siguiente (None si es la última).
+    """
+    ordenados = sorted(set(ids), key=str)
+    claves = [str(i) for i in ordenados]
+    inicio = bisect_right(claves, str(after)) if after else 0
+    fin = len(ordenados) if limit is None else min(len(ordenados), inicio + limit)
+    pagina = ordenados[inicio:fin]
+    siguiente = pagina[-1] if pagina and fin < len(ordenados) else None
+    return pagina, siguiente
+
+def iter_news_details(
+    db: Session,
+    ids: Sequence[UUID],
+    rights: Sequence[str],
+    fields: Optional[Sequence[str]] = None
+) -> Iterator[dict]:
+    """
+    Detalle de las noticias indicadas, en el orden de `ids`, como diccionarios
+    con id_news y los campos pedidos. Consulta por bloques de _DETAILS_CHUNK y
+    solo lee las columnas necesarias (sin `fields`, todas).
+
+    filtered_analysis sale de analysis_detail filtrado por nombre de derecho en
+    SQL, como tuplas (derecho, cantidad, lugares) donde lugares es el JSON tal
+    como está guardado, sin decodificar.
+    """
+    campos = set(fields) if fields is not None else set(DETAILS_FIELDS)
+    columnas = [News.id_news] + [
+        getattr(News, campo) for campo in ("headline", "content", "news_date") if campo in campos
+    ]
+    con_analisis = "filtered_analysis" in campos and bool(rights)
+
+    for inicio in range(0, len(ids), _DETAILS_CHUNK):
+        bloque = list(ids[inicio:inicio + _DETAILS_CHUNK])
+        filas = {row.id_news: row for row in db.query(*columnas).filter(News.id_news.in_(bloque))}
+        analisis = _conteos_por_noticia(db, bloque, rights) if con_analisis else {}
+
+        for id_news in bloque:
+            row = filas.get(id_news)
+            if row is None:
+                continue
+            detalle = {"id_news": row.id_news}
+            for campo in ("headline", "content", "news_date"):
+                if campo in campos:
+                    detalle[campo] = getattr(row, campo)
+            if "filtered_analysis" in campos:
+                detalle["filtered_analysis"] = analisis.get(id_news, [])
+            yield detalle
+
+def _conteos_por_noticia(db: Session, ids_news: List[UUID], rights: Sequence[str]) -> Dict[UUID, List[Tuple[str, int, str]]]:
+    # analysis_detail JOIN right, filtrado por nombre de derecho en la base de datos
+    filas = (
+        db.query(Analysis.id_news, Right.right, AnalysisDetail.count, AnalysisDetail.places)
+        .join(AnalysisDetail, AnalysisDetail.id_analysis == Analysis.id_analysis)
+        .join(Right, Right.id_right == AnalysisDetail.id_right)
+        .filter(Analysis.id_news.in_(ids_news), Right.right.in_(list(rights)))
+        .order_by(Analysis.id_news, Right.order)
+    )
+    conteos: Dict[UUID, List[Tuple[str, int, str]]] = defaultdict(list)
+    for id_news, derecho, cantidad, lugares in filas:
+        conteos[id_news].append((derecho, cantidad, lugares or "[]"))
+    return conteos
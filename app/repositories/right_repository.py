@@ -1,10 +1,71 @@
+import hashlib
+import json
+import threading
+import time
+from types import MappingProxyType
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+from uuid import UUID
 from sqlalchemy.orm import Session
+from app.core import config
 from app.models.right import Right
 
-def get_all_visible_rights(db: Session):
-    return (
-        db.query(Right)
-        .filter(Right.visible == True)
-        .order_by(Right.order.asc())
-        .all()
-    )
\ No newline at end of file
+class RightEntry(NamedTuple):
+    """Copia en memoria de una fila de `right`, independiente de la sesión."""
+    id_right: UUID
+    right: str
+    order: int
+    visible: bool
+
+class RightsCatalog(NamedTuple):
+    entries: Tuple[RightEntry, ...]
+    by_name: Mapping[str, RightEntry]
+    by_id: Mapping[UUID, RightEntry]
+    etag: str
+    loaded_at: float
+
+_catalogo: Optional[RightsCatalog] = None
+_lock = threading.Lock()
+
+def _cargar_catalogo(db: Session) -> RightsCatalog:
+    entries = tuple(
+        RightEntry(id_right=r.id_right, right=r.right, order=r.order, visible=bool(r.visible))
+        for r in db.query(Right).order_by(Right.order.asc()).all()
+    )
+    firma = json.dumps([[str(e.id_right), e.right, e.order, e.visible] for e in entries], ensure_ascii=False)
+    return RightsCatalog(
+        entries=entries,
+        by_name=MappingProxyType({e.right: e for e in entries}),
+        by_id=MappingProxyType({e.id_right: e for e in entries}),
+        etag=hashlib.sha256(firma.encode("utf-8")).hexdigest()[:32],
+        loaded_at=time.monotonic()
+    )
+
+def get_rights_catalog(db: Session) -> RightsCatalog:
+    """
+    Catálogo de derechos cacheado en el proceso. Se recarga de la base de datos
+    al vencer config.RIGHTS_CACHE_TTL_SECONDS o tras invalidate_rights_cache().
+    """
+    global _catalogo
+    catalogo = _catalogo
+    if catalogo and time.monotonic() - catalogo.loaded_at < config.RIGHTS_CACHE_TTL_SECONDS:
+        return catalogo
+
+    with _lock:
+        catalogo = _catalogo
+        if not catalogo or time.monotonic() - catalogo.loaded_at >= config.RIGHTS_CACHE_TTL_SECONDS:
+            catalogo = _cargar_catalogo(db)
+            _catalogo = catalogo
+        return catalogo
+
+def invalidate_rights_cache():
+    """Llamar después de modificar la tabla `right` para que se relea en el próximo uso."""
+    global _catalogo
+    with _lock:
+        _catalogo = None
+
+def get_all_visible_rights(db: Session) -> List[RightEntry]:
+    return [e for e in get_rights_catalog(db).entries if e.visible]
+
+def get_rights_by_names(db: Session, names: List[str]) -> List[RightEntry]:
+    nombres = set(names)
+    return [e for e in get_rights_catalog(db).entries if e.right in nombres]
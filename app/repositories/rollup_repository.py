@@ -0,0 +1,123 @@
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Set, Tuple
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.analysis import Analysis
+from app.models.analysis_detail import AnalysisDetail
+from app.models.news import News
+from app.models.rights_rollup import RightsDailyRollup
+
+# (fecha, id_right) -> [cantidad, lugares]
+RollupDeltas = Dict[Tuple[date, UUID], list]
+
+def nuevos_deltas() -> RollupDeltas:
+    return defaultdict(lambda: [0, set()])
+
+def agregar_delta(deltas: RollupDeltas, fecha, id_right: UUID, cantidad: int, lugares: Iterable[str]):
+    if isinstance(fecha, datetime):
+        fecha = fecha.date()
+    delta = deltas[(fecha, id_right)]
+    delta[0] += cantidad
+    delta[1].update(lugares)
+
+def aplicar_deltas(db: Session, deltas: RollupDeltas):
+    """
+    Suma los deltas al rollup en la transacción en curso, junto con los
+    detalles que los originan. Las filas existentes se leen con bloqueo de
+    actualización para no perder sumas de otro proceso concurrente; si otro
+    proceso crea la misma fila entre la lectura y la inserción, la inserción
+    se descarta y el delta se suma a esa fila.
+    """
+    if not deltas:
+        return
+
+    fechas = list({fecha for fecha, _ in deltas})
+    derechos = list({id_right for _, id_right in deltas})
+    existentes = {
+        (fila.rollup_date, fila.id_right): fila
+        for fila in (
+            db.query(RightsDailyRollup)
+            .filter(RightsDailyRollup.rollup_date.in_(fechas), RightsDailyRollup.id_right.in_(derechos))
+            .with_for_update()
+        )
+    }
+
+    ahora = datetime.now()
+    for (fecha, id_right), (cantidad, lugares) in deltas.items():
+        fila = existentes.get((fecha, id_right))
+        if fila is None:
+            if _insertar(db, fecha, id_right, cantidad, lugares, ahora):
+                continue
+            fila = (
+                db.query(RightsDailyRollup)
+                .filter(RightsDailyRollup.rollup_date == fecha, RightsDailyRollup.id_right == id_right)
+                .with_for_update()
+                .one()
+            )
+        fila.count += cantidad
+        if not lugares.issubset(json.loads(fila.places)):
+            fila.places = _lugares_json(lugares.union(json.loads(fila.places)))
+        fila.updated_at = ahora
+    db.flush()
+
+def _insertar(db: Session, fecha: date, id_right: UUID, cantidad: int, lugares: Set[str], ahora: datetime) -> bool:
+    """
+    Inserta una fila nueva dentro de un savepoint. Retorna False si la clave ya
+    existe (la creó otro proceso); en ese caso solo se revierte el savepoint y
+    la transacción en curso sigue intacta.
+    """
+    try:
+        with db.begin_nested():
+            db.add(RightsDailyRollup(
+                rollup_date=fecha,
+                id_right=id_right,
+                count=cantidad,
+                places=_lugares_json(lugares),
+                updated_at=ahora
+            ))
+    except IntegrityError:
+        return False
+    return True
+
+def get_rollup(db: Session, desde: date, hasta: date, id_rights: List[UUID]) -> List[RightsDailyRollup]:
+    """Filas del rollup en el rango de fechas (inclusive) para los derechos indicados."""
+    if not id_rights:
+        return []
+    return (
+        db.query(RightsDailyRollup)
+        .filter(
+            RightsDailyRollup.rollup_date.between(desde, hasta),
+            RightsDailyRollup.id_right.in_(id_rights)
+        )
+        .all()
+    )
+
+def reconstruir_rollup(db: Session, desde: date, hasta: date) -> int:
+    """
+    Recalcula desde analysis_detail el rollup de las fechas indicadas
+    (inclusive), reemplazando lo que hubiera. Retorna las filas escritas.
+    No confirma la transacción.
+    """
+    inicio = datetime.combine(desde, datetime.min.time())
+    fin = datetime.combine(hasta, datetime.max.time())
+    filas = (
+        db.query(News.news_date, AnalysisDetail.id_right, AnalysisDetail.count, AnalysisDetail.places)
+        .join(Analysis, Analysis.id_news == News.id_news)
+        .join(AnalysisDetail, AnalysisDetail.id_analysis == Analysis.id_analysis)
+        .filter(News.news_date.between(inicio, fin))
+        .all()
+    )
+
+    deltas = nuevos_deltas()
+    for news_date, id_right, cantidad, lugares in filas:
+        agregar_delta(deltas, news_date, id_right, cantidad, json.loads(lugares) if lugares else [])
+
+    db.query(RightsDailyRollup).filter(RightsDailyRollup.rollup_date.between(desde, hasta)).delete(synchronize_session=False)
+    aplicar_deltas(db, deltas)
+    return len(deltas)
+
+def _lugares_json(lugares: Set[str]) -> str:
+    return json.dumps(sorted(lugares), ensure_ascii=False)
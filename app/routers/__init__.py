@@ -2,7 +2,13 @@ from fastapi import APIRouter
 
 from .right_router import router as rights_router
 from .news_router import router as news_router
+from .admin_router import router as admin_router
+from .report_router import router as report_router
+from .jobs_router import router as jobs_router
 
 router = APIRouter()
 router.include_router(rights_router, prefix="/rights", tags=["Rights"])
-router.include_router(news_router, prefix="/news", tags=["News"])
\ No newline at end of file
+router.include_router(news_router, prefix="/news", tags=["News"])
+router.include_router(admin_router, prefix="/admin", tags=["Admin"])
+router.include_router(report_router, prefix="/reports", tags=["Reports"])
+router.include_router(jobs_router, prefix="/jobs", tags=["Jobs"])
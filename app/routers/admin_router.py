@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException
+from app.core import caches as Caches
+from app.core import config
+from app.repositories import right_repository as RightRepository
+from app.utils import llm_metrics as LlmMetrics
+
+router = APIRouter()
+
+@router.get("/cache")
+def read_caches():
+    """Tamaño, entradas y aciertos/fallos de cada caché persistente."""
+    return {nombre: cache.stats() for nombre, cache in Caches.CACHES.items()}
+
+@router.delete("/cache/{nombre}")
+def purge_cache(nombre: str):
+    cache = Caches.CACHES.get(nombre)
+    if not cache:
+        raise HTTPException(status_code=404, detail=f"No existe la caché '{nombre}'.")
+    return {"cache": nombre, "eliminadas": cache.purge()}
+
+@router.post("/rights/invalidate")
+def invalidate_rights():
+    """Fuerza a releer la tabla `right` en el próximo uso (tras editarla directamente en la BD)."""
+    RightRepository.invalidate_rights_cache()
+    return {"invalidado": True}
+
+@router.get("/llm/metrics")
+def read_llm_metrics():
+    """Generaciones del LLM por etapa y modo, y cuántas se desperdiciaron por salida inválida."""
+    return {
+        "structured_output": config.LLM_STRUCTURED_OUTPUT,
+        "etapas": LlmMetrics.snapshot()
+    }
+
+@router.delete("/llm/metrics")
+def reset_llm_metrics():
+    LlmMetrics.reset()
+    return {"reiniciado": True}
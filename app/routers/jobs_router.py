@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, WebSocket
+from app.schemas.endpoints.jobs_schema import JobStatusResponse, JobSubmitRequest, JobSubmitResponse
+from app.services import jobs_service as JobsService
+from app.services import pipeline_service as PipelineService
+
+router = APIRouter()
+
+@router.post("/", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(payload: JobSubmitRequest):
+    """Encola el minado y análisis de noticias; el progreso se sigue por /jobs/{id}/ws."""
+    error = PipelineService.validar_solicitud(payload.dates, payload.rights)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    job, compartido = JobsService.submit(payload.dates, payload.rights, payload.use_cache)
+    return JobSubmitResponse(id_job=job.id_job, estado=job.estado, compartido=compartido)
+
+@router.get("/{id_job}", response_model=JobStatusResponse)
+def read_job(id_job: str):
+    job = JobsService.get_job(id_job)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"No existe el trabajo '{id_job}'.")
+    return job
+
+@router.websocket("/{id_job}/ws")
+async def subscribe_job_ws(websocket: WebSocket, id_job: str):
+    await websocket.accept()
+    await relay_job(websocket, id_job)
+
+async def relay_job(websocket: WebSocket, id_job: str):
+    """
+    Reenvía al WebSocket los mensajes del trabajo hasta el resultado final y
+    cierra. Si el cliente se desconecta el trabajo sigue corriendo.
+    """
+    try:
+        async for mensaje in JobsService.subscribe(id_job):
+            await websocket.send_json(mensaje)
+    except Exception:
+        # El cliente se desconectó; el trabajo no depende de la conexión
+        return
+    await websocket.close()
@@ -0,0 +1,53 @@
+import json
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.repositories import right_repository as RightRepository
+from app.repositories import rollup_repository as RollupRepository
+from app.schemas.endpoints.process_news_schema import ProcessResult, RightCount
+
+router = APIRouter()
+
+@router.get("/rights", response_model=List[ProcessResult])
+def reporte_derechos(
+    start_date: date,
+    end_date: date,
+    rights: Optional[List[str]] = Query(default=None),
+    db: Session = Depends(get_db)
+):
+    """
+    Conteos por fecha y derecho ya analizados, leídos del rollup diario con una
+    sola consulta (sin minado ni LLM). Sin `rights`, incluye los derechos
+    visibles. Mismo formato que el resultado de /news/ws/process.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date no puede ser anterior a start_date")
+
+    catalogo = RightRepository.get_rights_catalog(db)
+    if rights is None:
+        rights = [r.right for r in RightRepository.get_all_visible_rights(db)]
+    derechos = [catalogo.by_name[nombre] for nombre in rights if nombre in catalogo.by_name]
+
+    filas = RollupRepository.get_rollup(db, start_date, end_date, [r.id_right for r in derechos])
+    por_fecha = defaultdict(dict)
+    for fila in filas:
+        por_fecha[fila.rollup_date][fila.id_right] = fila
+
+    resultados = []
+    for dia in range((end_date - start_date).days + 1):
+        fecha = start_date + timedelta(days=dia)
+        conteo = []
+        for nombre in rights:
+            entrada = catalogo.by_name.get(nombre)
+            fila = por_fecha[fecha].get(entrada.id_right) if entrada else None
+            conteo.append(RightCount(
+                derecho=nombre,
+                cantidad=fila.count if fila else 0,
+                lugares=json.loads(fila.places) if fila else []
+            ))
+        resultados.append(ProcessResult(fecha=fecha.isoformat(), conteo=conteo))
+
+    return resultados
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
+from app.core import config
 from app.database import get_db
 from app.schemas.database import right_schema as RightSchema
 from app.repositories import right_repository as RightService
@@ -7,6 +8,15 @@ from app.repositories import right_repository as RightService
 router = APIRouter()
 
 @router.get("/", response_model=list[RightSchema.RightRead])
-def read_rights(db: Session = Depends(get_db)):
-    return RightService.get_all_visible_rights(db)
+def read_rights(request: Request, response: Response, db: Session = Depends(get_db)):
+    catalogo = RightService.get_rights_catalog(db)
+    headers = {
+        "ETag": f'"{catalogo.etag}"',
+        "Cache-Control": f"public, max-age={config.RIGHTS_CACHE_TTL_SECONDS}"
+    }
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
 
+    response.headers.update(headers)
+    return RightService.get_all_visible_rights(db)
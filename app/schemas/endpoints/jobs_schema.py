@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+class JobSubmitRequest(BaseModel):
+    dates: List[str]  # [fecha_inicio, fecha_fin] en formato "YYYY-MM-DD"
+    rights: List[str]  # Derechos humanos a analizar
+    use_cache: bool = True
+
+class JobSubmitResponse(BaseModel):
+    id_job: str
+    estado: str
+    compartido: bool = False  # True si se unió a un trabajo idéntico en curso
+
+class JobStatusResponse(BaseModel):
+    id_job: str
+    estado: str
+    solicitud: Dict[str, Any]
+    progreso: Optional[Dict[str, Any]] = None  # Último mensaje de progreso
+    final: Optional[Dict[str, Any]] = None  # Mensaje "result" o "error" al terminar
+    created_at: float
+    updated_at: float
@@ -1,17 +1,28 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
+# Campos que se pueden pedir en `fields`; id_news siempre se incluye
+NewsDetailsField = Literal["headline", "content", "news_date", "filtered_analysis"]
+
 class NewsDetailsRequest(BaseModel):
     ids: List[UUID]
     rights: List[str]
+    # Paginación por clave: `after` es el cursor devuelto en X-Next-Cursor
+    # (o en la última línea "next_cursor" con `stream`)
+    after: Optional[UUID] = None
+    limit: Optional[int] = Field(default=None, ge=1, le=5000)
+    # Proyección opcional (por ejemplo, sin content); None = todos los campos
+    fields: Optional[List[NewsDetailsField]] = None
+    # Respuesta en NDJSON, una noticia por línea, a medida que se leen
+    stream: bool = False
 
 class NewsDetailsResponse(BaseModel):
     id_news: UUID
-    headline: str
-    content: str
-    news_date: datetime 
+    headline: Optional[str] = None
+    content: Optional[str] = None
+    news_date: Optional[datetime] = None
     filtered_analysis: Optional[List[Dict[str, Any]]] = None 
 
     class Config:
@@ -1,17 +1,60 @@
 import os
 import re
+import time
+import hashlib
+import asyncio
 from datetime import datetime
 import json
-from typing import List, Dict, Any
-#import ollama
-from ollama import Client
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from tika import parser
-from bs4 import BeautifulSoup
+from tika import tika as TikaLib
+from bs4 import BeautifulSoup, SoupStrainer
+from app.core import config
+from app.core import caches as Caches
+from app.utils import llm_metrics as LlmMetrics
 from app.utils import logger as Logger
-from app.utils import ollama_helpers as OllamaHelpers
+from app.utils import ollama_client as OllamaClient
+from app.utils import tika_pool as TikaPool
 
 logger = Logger.setup_logger()
-ollama = Client(host='http://127.0.0.1:11434')
+
+# Cambiar la versión invalida la caché de páginas cuando cambia la forma de extraer
+EXTRACTOR_VERSION = f"tika-{TikaLib.TikaVersion}:div-page:v1"
+
+INSTRUCCIONES_SEPARACION = '''
+Separa el texto en cada artículo informativo que presenta, la salida DEBE ser un arreglo de JSON, donde cada item contenga una clave de "titular" y "contenido". \n
+[\n
+  {\n
+    "titular": "Aquí va el titular",\n
+    "contenido": "Aquí va el contenido"\n
+  }\n
+]\n
+Debes seguir ESTRICTAMENTE el formato JSON, sin agregar ningún texto adicional. \n
+Cada artículo debe ser un objeto con las claves "titular" y "contenido". \n
+TODO debe ir en español. \n
+NO omitas texto. \n
+NO agregues explicaciones. \n
+SOLO devuelve el JSON. \n
+No discrimines reportajes objetivos sobre temas controversiales.\n
+Texto:\n
+'''
+
+# Versión del prompt de separación: cualquier cambio en las instrucciones invalida la caché
+SEPARATION_PROMPT_VERSION = hashlib.sha256(INSTRUCCIONES_SEPARACION.encode("utf-8")).hexdigest()[:12]
+
+# JSON schema de la separación para el modo de salida estructurada (config.LLM_STRUCTURED_OUTPUT)
+FORMATO_SEPARACION = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "titular": {"type": "string"},
+            "contenido": {"type": "string"}
+        },
+        "required": ["titular", "contenido"]
+    }
+}
 
 def leer_pdf(folder_name: str) -> List[str]:
     logger.info("************************LEYENDO PDFS************************")
@@ -32,41 +75,86 @@ def construir_prompts_extraer(instructions: str, text: str) -> str:
     {text}"""
     return prompt
 
-def extraer_texo(prompt: str) -> str:
-    response = ollama.chat(
-        model='llama3.2-vision',
-        messages=[{
+async def extraer_texo(prompt: str, formato: Optional[dict] = None, num_predict: Optional[int] = None) -> str:
+    payload = {
+        'model': config.OLLAMA_VISION_MODEL,
+        'messages': [{
             'role': 'user',
             'content': prompt
         }]
-    )
+    }
+    if formato is not None:
+        payload['format'] = formato
+    if num_predict:
+        payload['options'] = {'num_predict': num_predict}
+    response = await OllamaClient.chat(payload)
     print(response)
-    return response.message.content
+    return response['message']['content']
+
+def hash_archivo(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _extraer_paginas_archivo(pdf_path: str) -> Tuple[List[str], float]:
+    inicio = time.perf_counter()
+    pages_text = []
+    try:
+        clave_cache = f"{hash_archivo(pdf_path)}:{EXTRACTOR_VERSION}"
+        cached = Caches.paginas.get(clave_cache)
+        if cached is not None:
+            duracion = time.perf_counter() - inicio
+            logger.info(f"Archivo {pdf_path}: páginas tomadas de caché en {duracion:.2f}s")
+            return json.loads(cached), duracion
+
+        logger.info(f"Procesando archivo: {pdf_path}")
+        parsed = parser.from_file(pdf_path, serverEndpoint=TikaPool.next_endpoint(), xmlContent=True)
+        xml = parsed.get('content', '')
+
+        if not xml:
+            logger.warning(f"No se pudo extraer contenido del archivo: {pdf_path}")
+        else:
+            # Solo se construye el árbol de los <div class="page">
+            soup = BeautifulSoup(xml, 'lxml', parse_only=SoupStrainer('div', {'class': 'page'}))
+            pages = soup.find_all('div', {'class': 'page'})
+
+            for page in pages:
+                pages_text.append(page.get_text(separator='\n', strip=True))
+
+            if pages_text:
+                Caches.paginas.set(clave_cache, json.dumps(pages_text, ensure_ascii=False))
+
+    except Exception as e:
+        logger.error(f"Error al procesar el archivo {pdf_path}: {str(e)}")
+
+    duracion = time.perf_counter() - inicio
+    logger.info(f"Archivo {pdf_path}: {len(pages_text)} páginas en {duracion:.2f}s")
+    return pages_text, duracion
+
+def extraer_paginas_pdf(pdfs: List[str], workers: Optional[int] = None) -> List[Tuple[str, List[str], float]]:
+    """
+    Extrae el texto por página de cada PDF en paralelo, repartiendo los archivos
+    entre los servidores del pool de Tika. Retorna (archivo, páginas, segundos)
+    en el mismo orden de `pdfs`.
+    """
+    if not pdfs:
+        return []
+
+    workers = max(1, min(workers or config.PDF_EXTRACTION_WORKERS, len(pdfs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tika") as executor:
+        resultados = list(executor.map(_extraer_paginas_archivo, pdfs))
+
+    return [(pdf, pages, duracion) for pdf, (pages, duracion) in zip(pdfs, resultados)]
 
 def extraer_texto_pdf(pdfs: List[str]) -> List[str]:
     logger.info("************************INICIA EXTRACCIÓN TEXTO************************")
     structured_text = []
 
-    for pdf_path in pdfs:
-        try:
-            logger.info(f"Procesando archivo: {pdf_path}")
-            parsed = parser.from_file(pdf_path, xmlContent=True)
-            xml = parsed.get('content', '')
-            
-            if not xml:
-                logger.warning(f"No se pudo extraer contenido del archivo: {pdf_path}")
-                continue
-            
-            soup = BeautifulSoup(xml, 'lxml')
-            pages = soup.find_all('div', {'class': 'page'})
-
-            for i, page in enumerate(pages):
-                text = page.get_text(separator='\n', strip=True)
-                structured_text.append(text)
+    for _, pages, _ in extraer_paginas_pdf(pdfs):
+        structured_text.extend(pages)
 
-        except Exception as e:
-            logger.error(f"Error al procesar el archivo {pdf_path}: {str(e)}")
-    
     logger.info("************************FINALIZA EXTRACCIÓN TEXTO************************")
     return structured_text
 
@@ -120,57 +208,112 @@ def extraer_fecha_pdf(text : str) -> str:
         print("No se encontró ninguna fecha.")
         return ''
 
-def separar_noticias(news : List[str]) -> List[str]:
-    h = 0
+async def separar_noticias(
+    news : List[str],
+    workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None
+) -> List[str]:
+    """
+    Separa las páginas en artículos enviando bloques de 2 páginas al modelo.
+
+    Los bloques se envían en paralelo (como máximo `workers`, por defecto
+    config.SEPARATION_WORKERS) y el resultado conserva el orden de las páginas.
+    `on_progress(completados, total)` se llama cada vez que termina un bloque.
+    """
     logger.info("************************INICIO SEPARACIÓN DE NOTICIAS************************")
 
-    if not OllamaHelpers.verify_and_run_ollama():
+    total_pages = len(news)
+    size = 2
+    bloques_limpios = [
+        limpiar_texto('\n\n'.join([f'Página #{i+1}\n{p}' for i, p in enumerate(news[j:j + size])]))
+        for j in range(0, total_pages, size)
+    ]
+    claves_cache = [_clave_separacion(texto) for texto in bloques_limpios]
+    cacheados = [Caches.separacion.get(clave) for clave in claves_cache]
+
+    # Si todos los bloques ya se separaron antes, no hace falta Ollama
+    if any(c is None for c in cacheados) and not await OllamaClient.ensure_ollama():
         logger.error("❌ No se pudo iniciar o verificar Ollama. Cancelando separación de noticias.")
         return []
 
-    total_pages = len(news)
-    size = 2
-    json_news = []
-    instructions_separate = '''
-Separa el texto en cada artículo informativo que presenta, la salida DEBE ser un arreglo de JSON, donde cada item contenga una clave de "titular" y "contenido". \n
-[\n
-  {\n
-    "titular": "Aquí va el titular",\n
-    "contenido": "Aquí va el contenido"\n
-  }\n
-]\n
-Debes seguir ESTRICTAMENTE el formato JSON, sin agregar ningún texto adicional. \n
-Cada artículo debe ser un objeto con las claves "titular" y "contenido". \n
-TODO debe ir en español. \n
-NO omitas texto. \n
-NO agregues explicaciones. \n
-SOLO devuelve el JSON. \n
-No discrimines reportajes objetivos sobre temas controversiales.\n
-Texto:\n
-'''
+    semaforo = asyncio.Semaphore(max(1, workers or config.SEPARATION_WORKERS))
+    completados = 0
+
+    async def separar_bloque(h: int) -> str:
+        nonlocal completados
+        json_message = cacheados[h - 1]
+
+        if json_message is not None:
+            logger.info(f"Bloque {h} tomado de caché")
+        else:
+            json_message = await llamar_modelo(h, bloques_limpios[h - 1])
+            if _es_arreglo_json(json_message):
+                Caches.separacion.set(claves_cache[h - 1], json_message)
+
+        completados += 1
+        if on_progress:
+            await on_progress(completados, len(bloques_limpios))
+        return json_message
+
+    async def llamar_modelo(h: int, texto_bloque_clean: str) -> str:
+        async with semaforo:
+            logger.info(f"************************COMIENZA LLAMADA A GEMMA PARA BLOQUE {h}************************")
+            logger.info(f"************************CONSTRUCCIÓN DE PROMPT************************")
+            prompt_separate = construir_prompts_extraer(INSTRUCCIONES_SEPARACION, texto_bloque_clean)
+            logger.info(f"Prompt enviado al modelo (bloque {h}):\n{prompt_separate}")
+            logger.info(f"************************INICIO EJECUCIÓN DE LA LLAMADA************************")
+            try:
+                if config.LLM_STRUCTURED_OUTPUT:
+                    # La salida reproduce el texto del bloque: el tope se calcula con su tamaño
+                    response = await extraer_texo(
+                        prompt_separate,
+                        formato=FORMATO_SEPARACION,
+                        num_predict=LlmMetrics.limite_tokens(len(texto_bloque_clean))
+                    )
+                else:
+                    response = await extraer_texo(prompt_separate)
+            except Exception as e:
+                # Un bloque fallido no descarta el resto del periódico
+                logger.error(f"Error al separar el bloque {h}: {str(e)}")
+                return ""
+            logger.info(f"Respuesta recibida por el modelo (bloque {h}):\n{response}")
+            logger.info(f"************************TERMINA LLAMADA A GEMMA PARA BLOQUE {h}************************")
+
+        if config.LLM_STRUCTURED_OUTPUT:
+            json_message = response.strip()
+            valida = _es_arreglo_json(json_message)
+            LlmMetrics.registrar("separacion", LlmMetrics.ESQUEMA, valida)
+        else:
+            start_index = response.find("[")
+            end_index = response.rfind("]") + 1
+            json_message = response[start_index:end_index]
+            valida = _es_arreglo_json(json_message)
+            LlmMetrics.registrar("separacion", LlmMetrics.LIBRE, valida)
+        if not valida:
+            logger.warning(f"Bloque {h}: la respuesta del modelo no es un arreglo JSON")
+        return json_message
+
     logger.info("************************PROCESANDO TEXTO BLOQUE POR BLOQUE************************")
-    for i in range(0, total_pages, size):
-        h = h + 1
-        bloque = news[i:i + size]
-        texto_bloque = '\n\n'.join([f'Página #{i+1}\n{p}' for i, p in enumerate(bloque)])
-        texto_bloque_clean = limpiar_texto(texto_bloque)
-        logger.info(f"************************COMIENZA LLAMADA A GEMMA PARA BLOQUE {h}************************")
-        logger.info(f"************************CONSTRUCCIÓN DE PROMPT************************")    
-        prompt_separate = construir_prompts_extraer(instructions_separate, texto_bloque_clean)
-        print(prompt_separate)
-        logger.info(f"Prompt enviado al modelo (bloque {h}):\n{prompt_separate}")
-        logger.info(f"************************INICIO EJECUCIÓN DE LA LLAMADA************************")  
-        response = extraer_texo(prompt_separate)
-        logger.info(f"Respuesta recibida por el modelo (bloque {h}):\n{response}")
-        print(response)
-        logger.info(f"************************TERMINA LLAMADA A GEMMA PARA BLOQUE {h}************************")
-        start_index = response.find("[")
-        end_index = response.rfind("]") + 1
-        json_message = response[start_index:end_index]
-        json_news.append(json_message)
+    # gather devuelve los resultados en el orden de los bloques, no en el de finalización
+    json_news = await asyncio.gather(*(
+        separar_bloque(h) for h in range(1, len(bloques_limpios) + 1)
+    ))
 
     logger.info("************************SEPARACIÓN TEXTO BLOQUE POR BLOQUE FINALIZADO************************")
-    return json_news
+    return list(json_news)
+
+def _clave_separacion(texto_bloque_clean: str) -> str:
+    texto_hash = hashlib.sha256(texto_bloque_clean.encode("utf-8")).hexdigest()
+    # Las respuestas con JSON schema se guardan aparte de las del modo libre
+    version = f"{SEPARATION_PROMPT_VERSION}:{LlmMetrics.ESQUEMA}" if config.LLM_STRUCTURED_OUTPUT else SEPARATION_PROMPT_VERSION
+    return f"{config.OLLAMA_VISION_MODEL}:{version}:{texto_hash}"
+
+def _es_arreglo_json(texto: str) -> bool:
+    # Solo se guardan respuestas utilizables; un fallo debe reintentarse en la próxima corrida
+    try:
+        return isinstance(json.loads(texto), list)
+    except (json.JSONDecodeError, TypeError):
+        return False
 
 def formatear_json(strdate: str, json_news: List[str]) -> List[Dict[str, Any]]:
     logger.info("************************FORMATEO JSON INICIADO************************")
@@ -1,10 +1,16 @@
-import json
-import requests
+import asyncio
+import hashlib
 from string import Template
+from typing import Dict, List, Optional, Tuple
 from app.core import config, prompts
-from app.utils import ollama_helpers as OllamaHelpers
+from app.utils import ollama_client as OllamaClient
 
-def fine_tune_llm():
+# Contexto (tokens de Ollama) obtenido al presentar el prompt de dominio,
+# indexado por (modelo, hash del prompt). Se reutiliza en cada análisis.
+_contextos: Dict[Tuple[str, str], List[int]] = {}
+_lock = asyncio.Lock()
+
+def get_domain_prompt() -> str:
     prompt = prompts.FINE_TUNNING_PROMPT
 
     if isinstance(prompt, Template):
@@ -12,19 +18,54 @@ def fine_tune_llm():
     else:
         prompt = str(prompt)
 
-    if not OllamaHelpers.verify_and_run_ollama():
-        return "[]"
+    return prompt
+
+def _clave_contexto(model: str, prompt: str) -> Tuple[str, str]:
+    return model, hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+async def fine_tune_llm(model: Optional[str] = None) -> Optional[List[int]]:
+    """
+    Devuelve el contexto del modelo ya "afinado" con el prompt de dominio.
+
+    /api/generate no guarda estado entre llamadas, así que el prompt de dominio
+    se envía una sola vez por modelo y se conservan los tokens de `context` que
+    devuelve Ollama. Solo se vuelve a generar si cambia el modelo o el prompt.
+    Retorna None si Ollama no está disponible o la respuesta no trae contexto.
+    """
+    model = model or config.MODEL_NAME
+    prompt = get_domain_prompt()
+    clave = _clave_contexto(model, prompt)
+
+    if clave in _contextos:
+        return _contextos[clave]
+
+    async with _lock:
+        # Otra tarea pudo haberlo generado mientras esperábamos el lock
+        if clave in _contextos:
+            return _contextos[clave]
+
+        if not await OllamaClient.ensure_ollama():
+            return None
 
-    try:
-        payload = {"model": config.MODEL_NAME, "prompt": prompt, "temperature": 0, "top_p": 1, "stop": ["\n\n"]}
-        response = requests.post(config.OLLAMA_API_URL, json=payload)
-        print(response.text)
+        try:
+            payload = {
+                "model": model,
+                "prompt": prompt,
+                "stream": False,
+                "options": {"temperature": 0, "top_p": 1, "num_predict": 16}
+            }
+            response = await OllamaClient.generate(payload)
+            data = response.json()
+            print("Fine-tuning:", data.get("response", "").strip())
+        except Exception as e:
+            print("Error al realizar fine-tunning:", e)
+            return None
 
-        lines = response.text.strip().split("\n")
-        responses = [json.loads(line)["response"] for line in lines if line.strip()]
-        respuesta_final = "".join(responses).strip()
-        print(respuesta_final)
-    except Exception as e:
-        print("Error al realizar fine-tunning:", e)
+        contexto = data.get("context")
+        if contexto:
+            _contextos[clave] = contexto
+        return contexto
 
-    return respuesta_final
\ No newline at end of file
+def clear_primed_context():
+    """Descarta los contextos en memoria; el siguiente análisis vuelve a generarlos."""
+    _contextos.clear()
@@ -0,0 +1,239 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
+from app.core import config
+from app.database import AsyncDB
+from app.services import pipeline_service as PipelineService
+from app.utils import logger as Logger
+from app.utils.job_store import JobStore
+from app.utils.progress_emitter import ProgressEmitter
+
+logger = Logger.setup_logger()
+
+PENDIENTE = "pendiente"
+EN_PROCESO = "en_proceso"
+COMPLETADO = "completado"
+ERROR = "error"
+TERMINADOS = [COMPLETADO, ERROR]
+
+# Como máximo un guardado del progreso por trabajo en este intervalo
+_INTERVALO_GUARDADO = 1.0
+
+_store = JobStore(config.JOBS_DB_PATH)
+_jobs: Dict[str, "Job"] = {}
+# Trabajo activo por clave de solicitud (ver PipelineService.clave_solicitud)
+_en_curso: Dict[str, "Job"] = {}
+_cola: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+class Job:
+    """
+    Un trabajo del pipeline en curso. Su `emisor` (ProgressEmitter) recibe los
+    mensajes del pipeline y los entrega a los suscriptores a ritmo limitado; el
+    último progreso queda como instantánea para quien se suscriba después.
+    """
+
+    def __init__(
+        self,
+        id_job: str,
+        solicitud: Dict[str, Any],
+        clave: str,
+        estado: str = PENDIENTE,
+        created_at: Optional[float] = None
+    ):
+        self.id_job = id_job
+        self.solicitud = solicitud
+        self.clave = clave
+        self.estado = estado
+        self.created_at = created_at or time.time()
+        self.updated_at = self.created_at
+        self.emisor = ProgressEmitter(
+            max_rate=config.PROGRESS_MAX_RATE,
+            queue_size=config.PROGRESS_QUEUE_SIZE,
+            on_flush=self._guardar_progreso
+        )
+        self._guardado_en = 0.0
+
+    @property
+    def progreso(self) -> Optional[dict]:
+        return self.emisor.ultimo_progreso
+
+    @property
+    def final(self) -> Optional[dict]:
+        return self.emisor.final
+
+    def cambiar_estado(self, estado: str):
+        self.estado = estado
+        self.guardar()
+
+    async def terminar(self, estado: str, final: dict):
+        """Entrega el progreso pendiente y el mensaje final a los suscriptores."""
+        self.estado = estado
+        await self.emisor.close(final)
+        self.guardar()
+
+    def _guardar_progreso(self):
+        if time.monotonic() - self._guardado_en >= _INTERVALO_GUARDADO:
+            self.guardar()
+
+    def guardar(self):
+        self.updated_at = time.time()
+        self._guardado_en = time.monotonic()
+        _store.save(self.resumen())
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            "id_job": self.id_job,
+            "estado": self.estado,
+            "solicitud": self.solicitud,
+            "progreso": self.progreso,
+            "final": self.final,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+def submit(fechas: List[str], derechos: List[str], use_cache: bool = True) -> Tuple[Job, bool]:
+    """
+    Encola un trabajo del pipeline. La solicitud ya debe estar validada.
+
+    Si ya hay un trabajo pendiente o en proceso con la misma clave (mismo rango,
+    derechos y PDF de entrada) se retorna ese en vez de crear otro; el segundo
+    valor indica si el trabajo es compartido.
+    """
+    clave = PipelineService.clave_solicitud(fechas, derechos, use_cache)
+    existente = _en_curso.get(clave)
+    if existente is not None:
+        return existente, True
+
+    job = Job(str(uuid4()), {"fechas": fechas, "derechos": derechos, "use_cache": use_cache}, clave)
+    job.guardar()
+    _registrar(job)
+    _encolar(job)
+    return job, False
+
+def get_job(id_job: str) -> Optional[Dict[str, Any]]:
+    """Estado del trabajo: en memoria si está activo, si no el guardado."""
+    job = _jobs.get(id_job)
+    return job.resumen() if job else _store.get(id_job)
+
+async def subscribe(id_job: str) -> AsyncIterator[dict]:
+    """
+    Mensajes del trabajo: primero un mensaje "job" con el estado y el último
+    progreso, luego los mensajes del pipeline y por último el resultado o error.
+    """
+    job = _jobs.get(id_job)
+    if job is None:
+        guardado = _store.get(id_job)
+        if guardado is None:
+            yield {"type": "error", "message": f"No existe el trabajo '{id_job}'."}
+            return
+        yield _instantanea(guardado)
+        if guardado["final"]:
+            yield guardado["final"]
+        return
+
+    suscripcion = job.emisor.subscribe()
+    try:
+        yield _instantanea(job.resumen())
+        if job.final:
+            yield job.final
+            return
+        while True:
+            mensaje = await suscripcion.get()
+            if mensaje is None:
+                return
+            yield mensaje
+    finally:
+        job.emisor.unsubscribe(suscripcion)
+
+def _instantanea(resumen: Dict[str, Any]) -> dict:
+    return {
+        "type": "job",
+        "id_job": resumen["id_job"],
+        "estado": resumen["estado"],
+        "progreso": resumen["progreso"]
+    }
+
+def _registrar(job: Job):
+    _jobs[job.id_job] = job
+    _en_curso.setdefault(job.clave, job)
+
+def _encolar(job: Job):
+    if _cola is None:
+        raise RuntimeError("La cola de trabajos no está iniciada (start_workers)")
+    _cola.put_nowait(job.id_job)
+
+async def start_workers(workers: Optional[int] = None):
+    """
+    Inicia los workers que ejecutan los trabajos (como máximo `workers`
+    pipelines a la vez, por defecto config.JOB_WORKERS). Los trabajos que
+    quedaron pendientes o en proceso al detener el servidor se vuelven a encolar.
+    """
+    global _cola
+    _cola = asyncio.Queue()
+
+    eliminados = _store.purge_older_than(config.JOBS_RETENTION_DAYS * 24 * 3600, TERMINADOS)
+    if eliminados:
+        logger.info(f"Trabajos antiguos eliminados: {eliminados}")
+
+    for guardado in _store.list_by_estado([PENDIENTE, EN_PROCESO]):
+        solicitud = guardado["solicitud"]
+        clave = PipelineService.clave_solicitud(solicitud["fechas"], solicitud["derechos"], solicitud.get("use_cache", True))
+        job = Job(guardado["id_job"], solicitud, clave, PENDIENTE, guardado["created_at"])
+        job.emisor.ultimo_progreso = guardado["progreso"]
+        _registrar(job)
+        _encolar(job)
+        logger.info(f"Trabajo {job.id_job} reencolado")
+
+    for _ in range(max(1, workers or config.JOB_WORKERS)):
+        _workers.append(asyncio.create_task(_worker()))
+
+async def stop_workers():
+    """Detiene los workers; los trabajos interrumpidos se retoman al iniciar."""
+    global _cola
+    for tarea in _workers:
+        tarea.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _jobs.clear()
+    _en_curso.clear()
+    _cola = None
+
+def _liberar(job: Job):
+    # Las solicitudes nuevas con la misma clave ya no se unen a este trabajo
+    if _en_curso.get(job.clave) is job:
+        del _en_curso[job.clave]
+
+async def _worker():
+    while True:
+        id_job = await _cola.get()
+        job = _jobs.get(id_job)
+        if job is None:
+            continue
+        await _ejecutar(job)
+
+async def _ejecutar(job: Job):
+    job.cambiar_estado(EN_PROCESO)
+    db = AsyncDB()
+    try:
+        resultado = await PipelineService.ejecutar_pipeline(
+            db,
+            job.solicitud["fechas"],
+            job.solicitud["derechos"],
+            emisor=job.emisor,
+            use_cache=job.solicitud.get("use_cache", True)
+        )
+        _liberar(job)
+        await job.terminar(COMPLETADO, {"type": "result", **resultado})
+    except asyncio.CancelledError:
+        # Servidor deteniéndose: queda "en_proceso" y se reencola al iniciar
+        raise
+    except Exception as e:
+        logger.error(f"Trabajo {job.id_job} falló: {str(e)}")
+        _liberar(job)
+        await job.terminar(ERROR, {"type": "error", "message": f"Error inesperado: {str(e)}"})
+    finally:
+        await db.close()
+        if job.estado in TERMINADOS:
+            _jobs.pop(job.id_job, None)
@@ -1,34 +1,52 @@
-import re
 import httpx
 import json
+import asyncio
+import hashlib
 from uuid import uuid4
 from datetime import datetime
-from typing import List, Set
-from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List
+from sqlalchemy.orm import Session, selectinload
 from collections import defaultdict
-from fastapi import WebSocket, WebSocketDisconnect
+from contextlib import aclosing
 from app.services import fine_tune_service as FineTuneService
 from app.models.analysis import Analysis
 from app.models.analysis_detail import AnalysisDetail
 from app.models.news import News
-from app.models.right import Right
+from app.repositories import right_repository as RightRepository
+from app.repositories import rollup_repository as RollupRepository
+from app.repositories.bulk_writer import BulkWriter
+from app.database import AsyncDB
 from app.schemas.endpoints.process_news_schema import ProcessResult, RightCount
-from app.utils import ollama_helpers as OllamaHelpers
+from app.utils import ollama_client as OllamaClient
 from app.data import locations as Locations
 from app.core import config, prompts
+from app.core import caches as Caches
 from app.utils import files_helpers as FilesHelpers
+from app.utils import json_stream as JsonStream
+from app.utils import llm_metrics as LlmMetrics
+from app.utils import text_helpers as TextHelpers
 from typing import List, Tuple, Optional
 
 async def process_news_batch(
-    db: Session,
+    db: AsyncDB,
     news_filepath: str,
     dates: List[str],
     rights: List[str],
-    websocket: Optional[WebSocket] = None
+    emisor=None,
+    workers: Optional[int] = None,
+    use_cache: bool = True
 ) -> Tuple[List[ProcessResult], List[str]]:
-    resultados_por_fecha = defaultdict(lambda: defaultdict(lambda: {"cantidad": 0, "lugares": set()}))
-    noticias_analizadas_ids: Set[str] = set()
-
+    """
+    Analiza las noticias de las fechas indicadas.
+
+    Las consultas y escrituras en base de datos van por `db.run` (una única
+    sesión, en el pool de hilos de base de datos) para no bloquear el event loop;
+    las llamadas al LLM corren en paralelo, como máximo `workers` a la vez (por
+    defecto config.ANALYSIS_WORKERS). Con `use_cache=False` no se reutilizan
+    respuestas previas del LLM. El progreso se envía con
+    `await emisor.send_json(mensaje)`; normalmente un ProgressEmitter, que
+    solo guarda el mensaje y lo entrega a los clientes a ritmo limitado.
+    """
     all_news = FilesHelpers.read_news_by_dates(news_filepath, dates)
 
     # ⛔ Validación: si no hay noticias, enviar resultados vacíos por fecha y derecho
@@ -41,8 +59,8 @@ async def process_news_batch(
             ]
             resultados_finales.append(ProcessResult(fecha=fecha, conteo=conteo))
 
-        if websocket:
-            await websocket.send_json({
+        if emisor:
+            await emisor.send_json({
                 "type": "warning",
                 "message": "No se encontraron noticias para ninguna de las fechas indicadas."
             })
@@ -50,72 +68,74 @@ async def process_news_batch(
         return resultados_finales, []
 
     total_news = len(all_news)
-    progress_actual = 30.0  # Minado ya cubrió el 30%
+    workers = max(1, workers or config.ANALYSIS_WORKERS)
+    progress_inicial = 30.0  # Minado ya cubrió el 30%
     progress_per_news = 70.0 / total_news  # Cada noticia aporta al 70% restante
+    completadas = 0
 
-    async def enviar_progreso(etapa: str, message: str, progreso_global: float):
-        if websocket:
-            await websocket.send_json({
+    # Resultados por índice de noticia: se combinan en orden al final,
+    # sin importar en qué orden terminen las llamadas al LLM.
+    resultados_por_noticia: Dict[int, List[dict]] = defaultdict(list)
+    ids_por_noticia: Dict[int, str] = {}
+
+    async def enviar_progreso(etapa: str, message: str):
+        if emisor:
+            await emisor.send_json({
                 "type": "progress",
                 "etapa": etapa,
                 "message": message,
-                "progreso": round(progreso_global, 2)
+                "progreso": round(progress_inicial + completadas * progress_per_news, 2),
+                "noticias_completadas": completadas,
+                "total_noticias": total_news
             })
 
-    for idx, news_item in enumerate(all_news):
-        # Verificar conexión del cliente
-        try:
-            await websocket.send_json({"type": "ping"})
-        except WebSocketDisconnect:
-            if websocket:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": "El cliente ha cerrado la conexión. El procesamiento ha sido cancelado."
-                })
-            return resultados_por_fecha, list(noticias_analizadas_ids)
+    # 1. Determinar derechos faltantes de todo el lote y preparar registros (una sola sesión)
+    writer, estado_noticias = await db.run(
+        _consultar_lote,
+        items=[(news_item["titular"], news_item["fecha"]) for news_item in all_news],
+        rights=rights
+    )
 
-        progress_local = 0.0
+    pendientes = []
+    contenidos_nuevos = []
+    analisis_nuevos = []
+    # Noticias repetidas en el archivo (mismo titular y fecha) se analizan una sola vez;
+    # las repeticiones reciben el resultado de la primera aparición.
+    pendiente_por_noticia: Dict = {}
+    repetidas: Dict[int, List[int]] = defaultdict(list)
+    for idx, (news_item, (news_entity, analysis, missing_rights)) in enumerate(zip(all_news, estado_noticias)):
         headline = news_item["titular"]
-        content = news_item["contenido"]
-        fecha = news_item["fecha"]
 
-        # 1. Cargando titulares: 5%
-        progress_local += progress_per_news * 0.05
-        await enviar_progreso("Análisis de noticias", "Cargando titulares", progress_actual + progress_local)
-
-        # 2. Determinar derechos faltantes: +15%
-        news_entity, analysis, missing_rights = get_missing_rights_for_news(
-            db=db,
-            headline=headline,
-            date=fecha,
-            requested_right_names=rights
-        )
-        progress_local += progress_per_news * 0.15
-        await enviar_progreso("Análisis de noticias", "Determinando derechos faltantes", progress_actual + progress_local)
+        if news_entity.id_news in pendiente_por_noticia:
+            repetidas[pendiente_por_noticia[news_entity.id_news]].append(idx)
+            continue
 
+        # Content previo ya decodificado; None si no se pudo leer (se reconstruye de los detalles)
+        contenido_previo: Optional[List[dict]] = []
         if analysis and analysis.content:
             try:
                 existing_results = json.loads(analysis.content)
-                for item in existing_results:
-                    if item["derecho"] in rights:
-                        resultados_por_fecha[fecha][item["derecho"]]["cantidad"] += item["cantidad"]
-                        resultados_por_fecha[fecha][item["derecho"]]["lugares"].update(item["lugares"])
-                noticias_analizadas_ids.add(str(news_entity.id_news))
+                contenido_previo = existing_results
+                resultados_por_noticia[idx].extend(
+                    item for item in existing_results if item["derecho"] in rights
+                )
+                ids_por_noticia[idx] = str(news_entity.id_news)
             except Exception as e:
-                if websocket:
-                    await websocket.send_json({
+                contenido_previo = None
+                if emisor:
+                    await emisor.send_json({
                         "type": "error",
                         "message": f"Error al leer análisis previo para '{headline}': {str(e)}"
                     })
 
         # ✅ Si ya no hay derechos faltantes, no analizamos más, pero igual enviamos el resultado
         if not missing_rights:
-            progress_actual += progress_per_news  # Completa el 100% del bloque si ya fue analizada
-            await enviar_progreso("Análisis de noticias", "Ya estaba analizada", progress_actual)
+            completadas += 1
+            await enviar_progreso("Análisis de noticias", "Ya estaba analizada")
             continue
 
         if not news_entity.content:
-            news_entity.content = content
+            contenidos_nuevos.append((news_entity, news_item["contenido"]))
 
         if not analysis:
             analysis = Analysis(
@@ -124,67 +144,200 @@ async def process_news_batch(
                 analysis_date=datetime.now(),
                 id_news=news_entity.id_news
             )
-            db.add(analysis)
-            db.flush()
-
-        # 3. Fine-tuning: +20%
-        if websocket:
-            await websocket.send_json({
-                "type": "status",
-                "message": f"Enviando a LLM: {headline[:60]}",
-                "fecha": fecha,
-                "noticia_actual": idx + 1,
-                "total_noticias": total_news
-            })
-
-        FineTuneService.fine_tune_llm()
-        progress_local += progress_per_news * 0.20
-        await enviar_progreso("Análisis de noticias", "Fine-tuning completado", progress_actual + progress_local)
-
-        # 4. Llamada al modelo: +50%
-        prompt = build_prompt(noticia=news_item, fecha=fecha, derechos=[r.right for r in missing_rights])
-        response_json_str = await get_ollama_response_async(prompt)
-        progress_local += progress_per_news * 0.50
-        await enviar_progreso("Análisis de noticias", "Respuesta del modelo recibida", progress_actual + progress_local)
-
-        try:
-            parsed_results = json.loads(response_json_str)
-            for item in parsed_results:
-                resultados_por_fecha[fecha][item["derecho"]]["cantidad"] += item["cantidad"]
-                resultados_por_fecha[fecha][item["derecho"]]["lugares"].update(item["lugares"])
-            noticias_analizadas_ids.add(str(news_entity.id_news))
-        except Exception as e:
-            if websocket:
-                await websocket.send_json({
-                    "type": "error",
-                    "message": f"Error al interpretar respuesta del LLM para '{headline}': {str(e)}"
+            analisis_nuevos.append(analysis)
+
+        pendiente_por_noticia[news_entity.id_news] = idx
+        pendientes.append((idx, news_item, news_entity, analysis, missing_rights, contenido_previo))
+
+    # Noticias y análisis nuevos deben existir antes de insertar sus detalles
+    await db.run(_guardar_registros, writer, contenidos_nuevos, analisis_nuevos)
+
+    # 2. Llamadas al modelo en paralelo, limitadas por el semáforo.
+    # El prompt de dominio se presenta una sola vez y su contexto se reutiliza.
+    contexto = await FineTuneService.fine_tune_llm() if pendientes else None
+    semaforo = asyncio.Semaphore(workers)
+
+    async def analizar(pendiente):
+        idx, news_item, _, _, missing_rights, _ = pendiente
+        async with semaforo:
+            if emisor:
+                await emisor.send_json({
+                    "type": "status",
+                    "message": f"Enviando a LLM: {news_item['titular'][:60]}",
+                    "fecha": news_item["fecha"],
+                    "noticia_actual": idx + 1,
+                    "total_noticias": total_news
                 })
-            continue
 
-        for item in parsed_results:
-            right_match = next((r for r in missing_rights if r.right == item["derecho"]), None)
-            if not right_match:
-                continue
-            detail = AnalysisDetail(
-                id_detail=uuid4(),
-                id_analysis=analysis.id_analysis,
-                id_right=right_match.id_right,
-                count=item["cantidad"],
-                places=json.dumps(item["lugares"], ensure_ascii=False)
+            derechos = [r.right for r in missing_rights]
+            prompt = build_prompt(noticia=news_item, fecha=news_item["fecha"], derechos=derechos)
+            formato, num_predict = (
+                build_analysis_format(news_item["contenido"], derechos) if config.LLM_STRUCTURED_OUTPUT else (None, None)
+            )
+            response_json_str = await get_ollama_response_async(
+                prompt,
+                context=contexto,
+                use_cache=use_cache,
+                formato=formato,
+                num_predict=num_predict
+            )
+        return [(pendiente, response_json_str)]
+
+    async def analizar_paquete(paquete):
+        if len(paquete) == 1:
+            return await analizar(paquete[0])
+
+        noticias = [news_item for _, news_item, _, _, _, _ in paquete]
+        derechos = [r.right for r in paquete[0][4]]
+        async with semaforo:
+            if emisor:
+                await emisor.send_json({
+                    "type": "status",
+                    "message": f"Enviando a LLM {len(paquete)} noticias: {noticias[0]['titular'][:60]}",
+                    "fecha": noticias[0]["fecha"],
+                    "noticia_actual": paquete[0][0] + 1,
+                    "total_noticias": total_news
+                })
+            por_noticia = await get_packed_response_async(
+                noticias,
+                derechos,
+                context=contexto,
+                use_cache=use_cache
             )
-            db.add(detail)
 
-        db.flush()
-        analysis.content = build_analysis_content_from_details(db, analysis.id_analysis)
+        if por_noticia is None:
+            # Respuesta empaquetada inválida: cada noticia se analiza por separado
+            respuestas = await asyncio.gather(*(analizar(p) for p in paquete))
+            return [resultado for respuesta in respuestas for resultado in respuesta]
+        return [
+            (pendiente, json.dumps(resultados, ensure_ascii=False))
+            for pendiente, resultados in zip(paquete, por_noticia)
+        ]
+
+    tareas = [asyncio.create_task(analizar_paquete(paquete)) for paquete in _empaquetar(pendientes)]
+    # Conteos nuevos por (fecha, derecho) para el rollup diario, se aplican al confirmar
+    rollup = RollupRepository.nuevos_deltas()
+
+    # 3. Guardado a medida que terminan (un único escritor sobre la sesión)
+    try:
+        for siguiente in asyncio.as_completed(tareas):
+            for pendiente, response_json_str in await siguiente:
+                idx, news_item, news_entity, analysis, missing_rights, contenido_previo = pendiente
+                completadas += 1 + len(repetidas[idx])
+
+                try:
+                    parsed_results = json.loads(response_json_str)
+                    for destino in (idx, *repetidas[idx]):
+                        resultados_por_noticia[destino].extend(parsed_results)
+                        ids_por_noticia[destino] = str(news_entity.id_news)
+                except Exception as e:
+                    if emisor:
+                        await emisor.send_json({
+                            "type": "error",
+                            "message": f"Error al interpretar respuesta del LLM para '{news_item['titular']}': {str(e)}"
+                        })
+                    await enviar_progreso("Análisis de noticias", "Respuesta del modelo descartada")
+                    continue
+
+                await db.run(_guardar_analisis, writer, news_entity, analysis, missing_rights, parsed_results, contenido_previo, rollup)
+
+                await enviar_progreso("Análisis de noticias", "Análisis guardado")
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+
+    await db.run(_confirmar, writer, rollup)
+
+    return _resultados_finales(dates, rights, all_news, resultados_por_noticia), _ids_ordenados(ids_por_noticia)
+
+# Pasos de base de datos del pipeline; corren en el pool de hilos vía AsyncDB.run
+
+def _consultar_lote(
+    db: Session,
+    items: List[Tuple[str, str]],
+    rights: List[str]
+) -> Tuple[BulkWriter, List[Tuple[News, Optional[Analysis], List[RightRepository.RightEntry]]]]:
+    # Inserciones y actualizaciones agrupadas en executemany por tabla
+    writer = BulkWriter(db, batch_size=config.DB_BULK_BATCH_SIZE)
+    estado_noticias = get_missing_rights_for_news_batch(
+        db=db,
+        items=items,
+        requested_right_names=rights,
+        writer=writer
+    )
+    return writer, estado_noticias
+
+def _guardar_registros(
+    db: Session,
+    writer: BulkWriter,
+    contenidos_nuevos: List[Tuple[News, str]],
+    analisis_nuevos: List[Analysis]
+):
+    for news_entity, contenido in contenidos_nuevos:
+        writer.update(news_entity, content=contenido)
+    writer.add_all(analisis_nuevos)
+    writer.flush()
+
+def _guardar_analisis(
+    db: Session,
+    writer: BulkWriter,
+    news_entity: News,
+    analysis: Analysis,
+    missing_rights: List[RightRepository.RightEntry],
+    parsed_results: List[dict],
+    contenido_previo: Optional[List[dict]],
+    rollup: RollupRepository.RollupDeltas
+):
+    nuevos_items = []
+    for item in parsed_results:
+        right_match = next((r for r in missing_rights if r.right == item["derecho"]), None)
+        if not right_match:
+            continue
+        detail = AnalysisDetail(
+            id_detail=uuid4(),
+            id_analysis=analysis.id_analysis,
+            id_right=right_match.id_right,
+            count=item["cantidad"],
+            places=json.dumps(item["lugares"], ensure_ascii=False)
+        )
+        writer.add(detail)
+        RollupRepository.agregar_delta(rollup, news_entity.news_date, right_match.id_right, item["cantidad"], item["lugares"])
+        nuevos_items.append({
+            "derecho": right_match.right,
+            "cantidad": item["cantidad"],
+            "lugares": item["lugares"]
+        })
 
-        # 5. Guardado final: +10%
-        progress_local += progress_per_news * 0.10
-        progress_actual += progress_local
-        await enviar_progreso("Análisis de noticias", "Análisis guardado", progress_actual)
+    if contenido_previo is not None:
+        writer.update(analysis, content=merge_analysis_content(contenido_previo, nuevos_items))
+    else:
+        # El content previo estaba corrupto: se reconstruye desde la base de datos
+        writer.flush()
+        writer.update(analysis, content=build_analysis_content_from_details(db, analysis.id_analysis))
 
+def _confirmar(db: Session, writer: BulkWriter, rollup: RollupRepository.RollupDeltas):
+    writer.flush()
+    RollupRepository.aplicar_deltas(db, rollup)
     db.commit()
 
-    # Asegurar que todas las fechas estén presentes
+def _resultados_finales(
+    dates: List[str],
+    rights: List[str],
+    all_news: List[dict],
+    resultados_por_noticia: Dict[int, List[dict]]
+) -> List[ProcessResult]:
+    """
+    Combina los resultados de cada noticia en orden de aparición y asegura
+    que todas las fechas y derechos solicitados estén presentes.
+    """
+    resultados_por_fecha = defaultdict(lambda: defaultdict(lambda: {"cantidad": 0, "lugares": set()}))
+
+    for idx in sorted(resultados_por_noticia):
+        fecha = all_news[idx]["fecha"]
+        for item in resultados_por_noticia[idx]:
+            resultados_por_fecha[fecha][item["derecho"]]["cantidad"] += item["cantidad"]
+            resultados_por_fecha[fecha][item["derecho"]]["lugares"].update(item["lugares"])
+
     resultados_finales = []
     for fecha in dates:
         derechos_dict = resultados_por_fecha.get(fecha, {})
@@ -198,14 +351,17 @@ async def process_news_batch(
             ))
         resultados_finales.append(ProcessResult(fecha=fecha, conteo=conteo))
 
-    return resultados_finales, list(noticias_analizadas_ids)
+    return resultados_finales
+
+def _ids_ordenados(ids_por_noticia: Dict[int, str]) -> List[str]:
+    return list(dict.fromkeys(ids_por_noticia[idx] for idx in sorted(ids_por_noticia)))
 
 def get_missing_rights_for_news(
     db: Session,
     headline: str,
     date: str,
     requested_right_names: List[str]
-) -> Tuple[Optional[News], Optional[Analysis], List[Right]]:
+) -> Tuple[Optional[News], Optional[Analysis], List[RightRepository.RightEntry]]:
     """
     Verifica qué derechos aún no han sido analizados para una noticia dada.
     Retorna la noticia (creada o existente), el análisis (creado o existente) y los derechos faltantes.
@@ -213,9 +369,10 @@ def get_missing_rights_for_news(
     parsed_date = datetime.strptime(date, "%Y-%m-%d")
 
     # 1. Buscar o crear la noticia
+    headline_hash = TextHelpers.hash_titular(headline)
     news_entity = (
         db.query(News)
-        .filter(News.headline == headline, News.news_date == parsed_date)
+        .filter(News.headline_hash == headline_hash, News.news_date == parsed_date)
         .first()
     )
 
@@ -223,6 +380,7 @@ def get_missing_rights_for_news(
         news_entity = News(
             id_news=uuid4(),
             headline=headline,
+            headline_hash=headline_hash,
             content="",  # Se llenará luego con el contenido real
             news_date=parsed_date,
         )
@@ -236,12 +394,8 @@ def get_missing_rights_for_news(
         .first()
     )
 
-    # 3. Obtener IDs de derechos solicitados
-    rights_requested = (
-        db.query(Right)
-        .filter(Right.right.in_(requested_right_names))
-        .all()
-    )
+    # 3. Obtener IDs de derechos solicitados (catálogo en memoria)
+    rights_requested = RightRepository.get_rights_by_names(db, requested_right_names)
 
     if not analysis:
         # No hay análisis aún => todos los derechos están pendientes
@@ -259,6 +413,90 @@ def get_missing_rights_for_news(
 
     return news_entity, analysis, missing_rights
 
+def get_missing_rights_for_news_batch(
+    db: Session,
+    items: List[Tuple[str, str]],
+    requested_right_names: List[str],
+    writer: Optional[BulkWriter] = None
+) -> List[Tuple[News, Optional[Analysis], List[RightRepository.RightEntry]]]:
+    """
+    Igual que get_missing_rights_for_news pero para varias noticias a la vez.
+    `items` son pares (titular, fecha YYYY-MM-DD); el resultado va en el mismo orden.
+    Hace un número fijo de consultas por bloque de _LOOKUP_CHUNK noticias en vez
+    de varias por noticia, con los detalles de cada análisis ya cargados.
+    Si se pasa `writer`, las noticias nuevas se encolan allí en vez de en la sesión.
+    """
+    titulares = {TextHelpers.hash_titular(headline): headline for headline, _ in items}
+    claves = [(TextHelpers.hash_titular(headline), datetime.strptime(date, "%Y-%m-%d")) for headline, date in items]
+
+    # 1. Derechos solicitados (catálogo en memoria)
+    rights_requested = RightRepository.get_rights_by_names(db, requested_right_names)
+
+    # 2. Noticias existentes, por el índice (headline_hash, news_date)
+    noticias: Dict[Tuple[str, datetime], News] = {}
+    claves_unicas = list(dict.fromkeys(claves))
+    fechas = list({fecha for _, fecha in claves_unicas})
+    for bloque in _en_bloques(list({headline_hash for headline_hash, _ in claves_unicas})):
+        encontradas = (
+            db.query(News)
+            .filter(News.headline_hash.in_(bloque), News.news_date.in_(fechas))
+            .all()
+        )
+        for news_entity in encontradas:
+            noticias.setdefault((news_entity.headline_hash, news_entity.news_date), news_entity)
+
+    # 3. Crear las que faltan con un único flush
+    nuevas = []
+    for headline_hash, fecha in claves_unicas:
+        if (headline_hash, fecha) not in noticias:
+            news_entity = News(
+                id_news=uuid4(),
+                headline=titulares[headline_hash],
+                headline_hash=headline_hash,
+                content="",  # Se llenará luego con el contenido real
+                news_date=fecha,
+            )
+            noticias[(headline_hash, fecha)] = news_entity
+            nuevas.append(news_entity)
+    if nuevas and writer:
+        writer.add_all(nuevas)
+    elif nuevas:
+        db.add_all(nuevas)
+        db.flush()
+
+    # 4. Análisis existentes con sus detalles cargados en la misma ronda
+    analisis: Dict = {}
+    ids_existentes = [n.id_news for n in noticias.values() if n not in nuevas]
+    for bloque in _en_bloques(ids_existentes):
+        encontrados = (
+            db.query(Analysis)
+            .options(selectinload(Analysis.details))
+            .filter(Analysis.id_news.in_(bloque))
+            .all()
+        )
+        for analysis in encontrados:
+            analisis.setdefault(analysis.id_news, analysis)
+
+    # 5. Derechos faltantes por noticia
+    resultado = []
+    for clave in claves:
+        news_entity = noticias[clave]
+        analysis = analisis.get(news_entity.id_news)
+        if not analysis:
+            resultado.append((news_entity, None, list(rights_requested)))
+            continue
+        analyzed_right_ids = {detail.id_right for detail in analysis.details}
+        missing_rights = [r for r in rights_requested if r.id_right not in analyzed_right_ids]
+        resultado.append((news_entity, analysis, missing_rights))
+
+    return resultado
+
+# SQL Server admite como máximo 2100 parámetros por consulta
+_LOOKUP_CHUNK = 1000
+
+def _en_bloques(valores: list, size: int = _LOOKUP_CHUNK) -> List[list]:
+    return [valores[i:i + size] for i in range(0, len(valores), size)]
+
 def build_prompt(noticia: dict, fecha: str, derechos: List[str]) -> str:
     texto = noticia["contenido"]
     lista_noticias = f"1. {texto}"
@@ -272,94 +510,399 @@ def build_prompt(noticia: dict, fecha: str, derechos: List[str]) -> str:
         lista_distritos="\n".join(f"- {d}" for d in lista_distritos)
     )
 
-def get_candidates_locations(noticia: str) -> List[str]:
-    ubicaciones = Locations.get_el_salvador_locations()
-    coincidencias = []
-
-    for ubicacion in ubicaciones:
-        for clave in ["distrito"]:
-            valor = ubicacion["distrito"].lower()
-            if re.search(rf'\b{re.escape(valor)}\b', noticia):
-                coincidencias.append(ubicacion["distrito"])
-                break
+def build_analysis_format(texto: str, derechos: List[str]) -> Tuple[dict, int]:
+    """
+    JSON schema de la respuesta de análisis para el parámetro `format` de Ollama
+    y el tope de tokens (num_predict) según el tamaño esperado: un objeto por
+    derecho con, como mucho, todos los distritos candidatos de la noticia.
+    """
+    formato, caracteres = _esquema_analisis(get_candidates_locations(texto), derechos)
+    return formato, LlmMetrics.limite_tokens(caracteres)
+
+def _esquema_analisis(distritos: List[str], derechos: List[str]) -> Tuple[dict, int]:
+    # Retorna el schema y el tamaño máximo esperado de la salida en caracteres
+    lugares = {"type": "array", "items": {"type": "string", "enum": distritos}} if distritos else {"type": "array", "maxItems": 0}
+    formato = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "derecho": {"type": "string", "enum": derechos},
+                "cantidad": {"type": "integer", "minimum": 0},
+                "lugares": lugares
+            },
+            "required": ["derecho", "cantidad", "lugares"]
+        }
+    }
+    por_derecho = 45 + sum(len(d) + 4 for d in distritos)
+    caracteres = sum(por_derecho + len(d) for d in derechos) + 2
+    return formato, caracteres
 
-    return coincidencias
+def _distritos_de(noticias: List[dict]) -> List[str]:
+    distritos = {d for noticia in noticias for d in get_candidates_locations(noticia["contenido"])}
+    return sorted(distritos, key=_ORDEN_DISTRITOS.__getitem__)
 
-async def get_ollama_response_async(prompt: str) -> str:
-    if not OllamaHelpers.verify_and_run_ollama():
-        return "[]"
+def build_packed_prompt(noticias: List[dict], fecha: str, derechos: List[str]) -> str:
+    """Prompt con varias noticias de la misma fecha; pide resultados por noticia."""
+    lista_noticias = "\n\n".join(f"{i}. {noticia['contenido']}" for i, noticia in enumerate(noticias, start=1))
+    lista_derechos = "\n".join(f"- {d}" for d in derechos)
 
+    return prompts.PACKED_PROMPT.substitute(
+        fecha=fecha,
+        total_noticias=len(noticias),
+        lista_noticias=lista_noticias,
+        lista_derechos=lista_derechos,
+        lista_distritos="\n".join(f"- {d}" for d in _distritos_de(noticias))
+    )
+
+def build_packed_analysis_format(noticias: List[dict], derechos: List[str]) -> Tuple[dict, int]:
+    """Como build_analysis_format, para la respuesta de build_packed_prompt."""
+    esquema, caracteres = _esquema_analisis(_distritos_de(noticias), derechos)
+    formato = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "noticia": {"type": "integer", "minimum": 1, "maximum": len(noticias)},
+                "derechos": esquema
+            },
+            "required": ["noticia", "derechos"]
+        },
+        "minItems": len(noticias),
+        "maxItems": len(noticias)
+    }
+    return formato, LlmMetrics.limite_tokens(len(noticias) * (caracteres + 30))
+
+def _empaquetar(pendientes: list) -> List[list]:
+    """
+    Agrupa las noticias pendientes para build_packed_prompt: misma fecha y mismos
+    derechos faltantes, hasta config.ANALYSIS_PACK_TOKEN_BUDGET tokens estimados
+    de prompt y config.ANALYSIS_PACK_MAX_ITEMS noticias por grupo. Sin
+    config.ANALYSIS_PACKING, cada noticia va sola.
+    """
+    if not config.ANALYSIS_PACKING or config.ANALYSIS_PACK_MAX_ITEMS < 2:
+        return [[pendiente] for pendiente in pendientes]
+
+    grupos: Dict[Tuple, list] = {}
+    for pendiente in pendientes:
+        _, news_item, _, _, missing_rights, _ = pendiente
+        clave = (news_item["fecha"], tuple(r.right for r in missing_rights))
+        grupos.setdefault(clave, []).append(pendiente)
+
+    paquetes = []
+    for (_, derechos), grupo in grupos.items():
+        base = _estimar_tokens(prompts.PACKED_PROMPT.template) + _estimar_tokens("\n".join(derechos))
+        paquete, tokens = [], base
+        for pendiente in grupo:
+            texto = pendiente[1]["contenido"]
+            costo = _estimar_tokens(texto) + _estimar_tokens("\n".join(get_candidates_locations(texto)))
+            if paquete and (tokens + costo > config.ANALYSIS_PACK_TOKEN_BUDGET or len(paquete) >= config.ANALYSIS_PACK_MAX_ITEMS):
+                paquetes.append(paquete)
+                paquete, tokens = [], base
+            paquete.append(pendiente)
+            tokens += costo
+        paquetes.append(paquete)
+    return paquetes
+
+def _estimar_tokens(texto: str) -> int:
+    return int(len(texto) / config.LLM_CHARS_PER_TOKEN) + 1
+
+def _construir_indice_distritos() -> Tuple[dict, Dict[str, int]]:
+    """
+    Trie por palabras normalizadas de los nombres de distrito. Cada nodo que
+    completa un nombre guarda el nombre original bajo la clave None.
+    También retorna la posición de cada nombre en el catálogo, para ordenar.
+    """
+    trie: dict = {}
+    orden: Dict[str, int] = {}
+
+    for posicion, ubicacion in enumerate(Locations.UBICACIONES):
+        nombre = ubicacion.distrito
+        nodo = trie
+        for palabra in TextHelpers.tokenizar(ubicacion.clave_distrito):
+            nodo = nodo.setdefault(palabra, {})
+        nodo[None] = nombre
+        orden.setdefault(nombre, posicion)
+
+    return trie, orden
+
+# Se construye una sola vez al importar el módulo
+_TRIE_DISTRITOS, _ORDEN_DISTRITOS = _construir_indice_distritos()
+
+def get_candidates_locations(noticia: str) -> List[str]:
+    """
+    Distritos mencionados en el texto, sin distinguir mayúsculas ni tildes y
+    respetando límites de palabra. Recorre el texto una sola vez; en cada palabra
+    sigue el trie, así que nombres anidados ("San Miguel" y "San Miguel Tepezontes")
+    se reportan ambos. Retorna nombres únicos en el orden del catálogo.
+    """
+    palabras = TextHelpers.tokenizar(noticia)
+    coincidencias = set()
+
+    for inicio in range(len(palabras)):
+        nodo = _TRIE_DISTRITOS.get(palabras[inicio])
+        siguiente = inicio + 1
+        while nodo:
+            if None in nodo:
+                coincidencias.add(nodo[None])
+            if siguiente >= len(palabras):
+                break
+            nodo = nodo.get(palabras[siguiente])
+            siguiente += 1
+
+    return sorted(coincidencias, key=_ORDEN_DISTRITOS.__getitem__)
+
+async def get_ollama_response_async(
+    prompt: str,
+    context: Optional[List[int]] = None,
+    use_cache: bool = True,
+    formato: Optional[dict] = None,
+    num_predict: Optional[int] = None,
+    validar_item: Optional[Callable[[Any], bool]] = None,
+    validar_respuesta: Optional[Callable[[List[Any]], bool]] = None,
+    etapa: str = "analisis"
+) -> str:
+    """
+    Envía el prompt de análisis a Ollama. `context` es el contexto del prompt de
+    dominio (ver FineTuneService.fine_tune_llm); si no se tiene, el prompt de
+    dominio se envía como `system` en la misma llamada.
+
+    Con `formato` (JSON schema, ver build_analysis_format) la salida la restringe
+    Ollama y se interpreta con un solo json.loads; sin él se lee en streaming.
+    `validar_item` valida cada elemento del arreglo (por defecto, un resultado
+    {derecho, cantidad, lugares}) y `validar_respuesta`, si se indica, el arreglo
+    completo. Las generaciones se cuentan en LlmMetrics bajo `etapa`.
+
+    Las respuestas válidas se guardan en la caché `respuestas_llm` por modelo,
+    opciones y prompt; `use_cache=False` fuerza una nueva generación.
+    """
     payload = {
         "model": config.MODEL_NAME,
         "prompt": prompt,
-        "temperature": 0,
-        "top_p": 1,
-        "stop": ["\n\n"]
+        "options": {
+            "temperature": 0,
+            "top_p": 1
+        }
     }
+    if formato is not None:
+        payload["format"] = formato
+        if num_predict:
+            payload["options"]["num_predict"] = num_predict
+    if context:
+        payload["context"] = context
+    else:
+        payload["system"] = FineTuneService.get_domain_prompt()
+
+    use_cache = use_cache and config.LLM_CACHE_ENABLED
+    clave_cache = _clave_respuesta(payload)
+    if use_cache:
+        cached = Caches.respuestas_llm.get(clave_cache)
+        if cached is not None:
+            return cached
+
+    if not await OllamaClient.ensure_ollama():
+        return "[]"
 
-    try:
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(config.OLLAMA_API_URL, json=payload)
-
-        print("\n📤 Respuesta cruda del LLM:\n", response.text, "\n")
+    validar_item = validar_item or _item_valido
+    if formato is not None:
+        return await _respuesta_estructurada(payload, clave_cache, use_cache, validar_item, validar_respuesta, etapa)
 
-        if not response.text.strip():
-            print("❌ La respuesta del LLM está vacía.")
+    # El arreglo se lee a medida que llega; al cerrarse se corta la generación
+    parser = JsonStream.JsonArrayParser()
+    texto = []
+    parsed = []
+    try:
+        async with aclosing(OllamaClient.generate_stream(payload)) as fragmentos:
+            async for fragmento in fragmentos:
+                texto.append(fragmento)
+                for item in parser.feed(fragmento):
+                    if not validar_item(item):
+                        print("⚠️ El JSON no tiene la estructura esperada.")
+                        LlmMetrics.registrar(etapa, LlmMetrics.LIBRE, valida=False)
+                        return "[]"
+                    parsed.append(item)
+                if parser.done:
+                    break
+
+        print("\n📤 Respuesta cruda del LLM:\n", "".join(texto), "\n")
+
+        if not parser.done:
+            LlmMetrics.registrar(etapa, LlmMetrics.LIBRE, valida=False)
+            print("❌ No se encontró un bloque JSON válido.")
             return "[]"
-
-        lines = response.text.strip().split("\n")
-        responses = [json.loads(line)["response"] for line in lines if line.strip()]
-        respuesta_final = "".join(responses).strip()
-
-        if isinstance(respuesta_final, list):
-            parsed = respuesta_final
-        else:
-            respuesta_sin_md = respuesta_final.replace("```json", "").replace("```", "").strip()
-
-            match = re.search(r"\[\s*(?:{.*?}\s*,?\s*)+\]", respuesta_sin_md, re.DOTALL)
-            if not match:
-                print("❌ No se encontró un bloque JSON válido.")
-                return "[]"
-
-            bloque_json = match.group(0)
-            parsed = json.loads(bloque_json)
-
-        if isinstance(parsed, list) and all(
-            isinstance(item, dict) and
-            "derecho" in item and
-            "cantidad" in item and
-            "lugares" in item and
-            isinstance(item["lugares"], list)
-            for item in parsed):
-            return json.dumps(parsed, ensure_ascii=False)
-        else:
-            print("⚠️ El JSON no tiene la estructura esperada.")
+        if validar_respuesta and not validar_respuesta(parsed):
+            LlmMetrics.registrar(etapa, LlmMetrics.LIBRE, valida=False)
             return "[]"
+        LlmMetrics.registrar(etapa, LlmMetrics.LIBRE, valida=True)
+        if not parsed:
+            return "[]"
+
+        resultado = json.dumps(parsed, ensure_ascii=False)
+        if use_cache:
+            Caches.respuestas_llm.set(clave_cache, resultado)
+        return resultado
 
-    except httpx.RequestError as e:
+    except httpx.HTTPError as e:
         print(f"❌ Error de red al consultar Ollama: {e}")
         return "[]"
+    except ValueError as e:
+        # El modelo generó un elemento que no es JSON válido
+        print("❌ Error procesando respuesta:", e)
+        LlmMetrics.registrar(etapa, LlmMetrics.LIBRE, valida=False)
+        return "[]"
     except Exception as e:
         print("❌ Error procesando respuesta:", e)
         return "[]"
-    
+
+async def _respuesta_estructurada(
+    payload: dict,
+    clave_cache: str,
+    use_cache: bool,
+    validar_item: Callable[[Any], bool],
+    validar_respuesta: Optional[Callable[[List[Any]], bool]],
+    etapa: str
+) -> str:
+    try:
+        response = await OllamaClient.generate({**payload, "stream": False})
+        response.raise_for_status()
+        datos = response.json()
+        if not isinstance(datos, dict):
+            raise ValueError(f"se esperaba un objeto JSON y llegó {type(datos).__name__}")
+    except httpx.HTTPError as e:
+        print(f"❌ Error de red al consultar Ollama: {e}")
+        return "[]"
+    except Exception as e:
+        # Cuerpo que no es JSON o no tiene la forma de /api/generate
+        print("❌ Error procesando respuesta:", e)
+        LlmMetrics.registrar(etapa, LlmMetrics.ESQUEMA, valida=False)
+        return "[]"
+
+    truncada = datos.get("done_reason") == "length"
+    try:
+        parsed = json.loads(datos.get("response") or "")
+        valida = (
+            isinstance(parsed, list)
+            and all(validar_item(item) for item in parsed)
+            and (validar_respuesta is None or validar_respuesta(parsed))
+        )
+    except Exception:
+        valida = False
+    LlmMetrics.registrar(etapa, LlmMetrics.ESQUEMA, valida, truncada, datos.get("eval_count"))
+
+    if not valida:
+        print("❌ Respuesta estructurada inválida" + (" (cortada por num_predict)." if truncada else "."))
+        return "[]"
+    if not parsed:
+        return "[]"
+
+    resultado = json.dumps(parsed, ensure_ascii=False)
+    if use_cache:
+        Caches.respuestas_llm.set(clave_cache, resultado)
+    return resultado
+
+async def get_packed_response_async(
+    noticias: List[dict],
+    derechos: List[str],
+    context: Optional[List[int]] = None,
+    use_cache: bool = True
+) -> Optional[List[List[dict]]]:
+    """
+    Analiza varias noticias de la misma fecha en una sola llamada y separa la
+    respuesta por noticia, en el mismo orden. Retorna None si la respuesta no
+    trae exactamente un resultado válido por noticia.
+    """
+    prompt = build_packed_prompt(noticias, noticias[0]["fecha"], derechos)
+    formato, num_predict = (
+        build_packed_analysis_format(noticias, derechos) if config.LLM_STRUCTURED_OUTPUT else (None, None)
+    )
+    respuesta = await get_ollama_response_async(
+        prompt,
+        context=context,
+        use_cache=use_cache,
+        formato=formato,
+        num_predict=num_predict,
+        validar_item=_item_empaquetado_valido,
+        # Si no se puede separar por noticia la generación cuenta como desperdiciada
+        # y no se guarda en caché
+        validar_respuesta=lambda items: _un_resultado_por_noticia(items, len(noticias)),
+        etapa="analisis_empaquetado"
+    )
+
+    items = json.loads(respuesta)
+    if not _un_resultado_por_noticia(items, len(noticias)):
+        print(f"⚠️ La respuesta empaquetada no trae un resultado por noticia ({len(noticias)} noticias).")
+        return None
+    por_noticia: Dict[int, List[dict]] = {}
+    for item in items:
+        por_noticia.setdefault(item["noticia"], item["derechos"])
+    return [por_noticia[i] for i in range(1, len(noticias) + 1)]
+
+def _un_resultado_por_noticia(items: List[dict], total: int) -> bool:
+    return sorted({item["noticia"] for item in items}) == list(range(1, total + 1))
+
+def _item_empaquetado_valido(item) -> bool:
+    return (
+        isinstance(item, dict) and
+        isinstance(item.get("noticia"), int) and
+        isinstance(item.get("derechos"), list) and
+        all(_item_valido(resultado) for resultado in item["derechos"])
+    )
+
+def _item_valido(item) -> bool:
+    return (
+        isinstance(item, dict) and
+        "derecho" in item and
+        "cantidad" in item and
+        "lugares" in item and
+        isinstance(item["lugares"], list)
+    )
+
+def _clave_respuesta(payload: dict) -> str:
+    """Hash de todo lo que determina la salida: modelo, opciones, prompt y contexto/system."""
+    material = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return f"{payload['model']}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+def merge_analysis_content(contenido_previo: List[dict], nuevos_items: List[dict]) -> str:
+    """
+    Content del análisis a partir del content previo (ya decodificado) y los
+    ítems recién guardados como detalles, serializado una sola vez. Equivale a
+    build_analysis_content_from_details sin volver a consultar la base de datos.
+    """
+    por_derecho = {item["derecho"]: item for item in contenido_previo}
+    for item in nuevos_items:
+        por_derecho[item["derecho"]] = item
+    return json.dumps(list(por_derecho.values()), ensure_ascii=False)
+
 def build_analysis_content_from_details(db: Session, analysis_id: str) -> str:
     """
     Reconstruye el JSON de content a partir de analysis_detail para un analysis dado.
     """
-    details = (
-        db.query(AnalysisDetail)
-        .join(Right, Right.id_right == AnalysisDetail.id_right)
-        .filter(AnalysisDetail.id_analysis == analysis_id)
-        .all()
-    )
+    return build_analysis_contents_from_details(db, [analysis_id])[analysis_id]
 
-    resultado = []
-    for d in details:
-        resultado.append({
-            "derecho": d.right.right,
-            "cantidad": d.count,
-            "lugares": json.loads(d.places) if d.places else []
-        })
+def build_analysis_contents_from_details(db: Session, analysis_ids: List) -> Dict:
+    """
+    Versión por lotes de build_analysis_content_from_details: una consulta por
+    bloque de _LOOKUP_CHUNK análisis. Retorna {id_analysis: content}.
+    """
+    derechos = RightRepository.get_rights_catalog(db).by_id
+    resultados: Dict = {analysis_id: [] for analysis_id in analysis_ids}
+
+    for bloque in _en_bloques(list(analysis_ids)):
+        details = (
+            db.query(AnalysisDetail)
+            .filter(AnalysisDetail.id_analysis.in_(bloque))
+            .all()
+        )
+        for d in details:
+            if d.id_right not in derechos:
+                continue
+            resultados[d.id_analysis].append({
+                "derecho": derechos[d.id_right].right,
+                "cantidad": d.count,
+                "lugares": json.loads(d.places) if d.places else []
+            })
 
-    return json.dumps(resultado, ensure_ascii=False)
\ No newline at end of file
+    return {
+        analysis_id: json.dumps(resultado, ensure_ascii=False)
+        for analysis_id, resultado in resultados.items()
+    }
@@ -0,0 +1,149 @@
+import os
+import json
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.database import AsyncDB
+from app.services import extract_news_service as TextMiner
+from app.services import news_processor_service as NewsProcessorService
+from app.utils import date_helpers as DateHelpers
+from app.utils import files_helpers as FilesHelpers
+
+# Carpeta de donde se leen los PDF de periódicos
+PDF_FOLDER = "newspaper"
+
+def validar_solicitud(fechas: Any, derechos: Any) -> Optional[str]:
+    """Mensaje de error de validación de la solicitud, o None si es válida."""
+    if not isinstance(fechas, list) or not fechas:
+        return "El campo 'dates' es obligatorio y debe ser una lista no vacía."
+
+    if not isinstance(derechos, list) or not derechos:
+        return "El campo 'rights' es obligatorio y debe ser una lista no vacía."
+
+    for f in fechas:
+        try:
+            datetime.strptime(f, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return f"La fecha '{f}' no tiene el formato válido YYYY-MM-DD."
+
+    return None
+
+def rango_fechas(fechas: List[str]) -> Tuple[str, str]:
+    return fechas[0], fechas[1] if len(fechas) > 1 else fechas[0]
+
+def clave_solicitud(fechas: List[str], derechos: List[str], use_cache: bool = True) -> str:
+    """
+    Clave normalizada de una solicitud: rango de fechas, derechos tal como se
+    pidieron y el conjunto de PDF de entrada (nombre, tamaño y fecha de
+    modificación). Dos solicitudes con la misma clave producen el mismo resultado;
+    los derechos no se ordenan porque el conteo del resultado sigue su orden.
+    """
+    try:
+        pdfs = sorted(
+            (entrada.name, entrada.stat().st_size, entrada.stat().st_mtime_ns)
+            for entrada in os.scandir(PDF_FOLDER)
+            if entrada.name.endswith(".pdf")
+        )
+    except FileNotFoundError:
+        pdfs = []
+
+    clave = {
+        "rango": rango_fechas(fechas),
+        "derechos": list(derechos),
+        "use_cache": use_cache,
+        "pdfs": pdfs
+    }
+    return hashlib.sha256(json.dumps(clave, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+async def ejecutar_pipeline(
+    db: AsyncDB,
+    fechas: List[str],
+    derechos: List[str],
+    emisor,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Minado de los PDF de "newspaper" (Tika → separación con IA → JSON) y
+    análisis de derechos de las noticias del rango de fechas. El progreso se
+    envía con `await emisor.send_json(mensaje)`. Retorna resultados y noticias.
+    """
+    fecha_inicio, fecha_fin = rango_fechas(fechas)
+    dates_rango = DateHelpers.generar_rango_fechas(fecha_inicio, fecha_fin)
+
+    await emisor.send_json({"type": "status", "message": "Iniciando minado de noticias"})
+
+    # Leer PDFs de la carpeta "newspaper"
+    pdf_files = TextMiner.leer_pdf(PDF_FOLDER)
+    await emisor.send_json({
+        "type": "progress",
+        "etapa": "Minado de noticias",
+        "message": "PDF leídos",
+        "progreso": 4
+    })
+
+    await emisor.send_json({"type": "status", "message": "Extrayendo texto de PDFs"})
+
+    # Extraer texto de los PDFs (en paralelo contra el pool de Tika, fuera del event loop)
+    paginas_por_pdf = await asyncio.to_thread(TextMiner.extraer_paginas_pdf, pdf_files)
+    text_extracted = [pagina for _, paginas, _ in paginas_por_pdf for pagina in paginas]
+    await emisor.send_json({
+        "type": "progress",
+        "etapa": "Minado de noticias",
+        "message": "Texto extraído de PDFs",
+        "progreso": 12,
+        "tiempos": {os.path.basename(pdf): round(segundos, 2) for pdf, _, segundos in paginas_por_pdf}
+    })
+
+    await emisor.send_json({"type": "status", "message": "Separando y formateando noticias mediante IA"})
+
+    # Extraer fecha del primer elemento del texto extraído
+    fecha = TextMiner.extraer_fecha_pdf(text_extracted[1])
+
+    print("FECHA EXTRAÍDA", fecha)
+
+    # Separar noticias utilizando IA (bloques en paralelo, sin bloquear el servidor)
+    async def progreso_separacion(completados: int, total: int):
+        await emisor.send_json({
+            "type": "progress",
+            "etapa": "Minado de noticias",
+            "message": f"Bloques separados: {completados}/{total}",
+            "progreso": round(12 + 13 * completados / total, 2)
+        })
+
+    news_separated = await TextMiner.separar_noticias(text_extracted, on_progress=progreso_separacion)
+    await emisor.send_json({
+        "type": "progress",
+        "etapa": "Minado de noticias",
+        "message": "Noticias separadas por IA",
+        "progreso": 25
+    })
+
+    # Formatear noticias en JSON
+    json_output = TextMiner.formatear_json(fecha, news_separated)
+
+    # Guardar noticias en un archivo JSON
+    news_filepath = FilesHelpers.save_news_in_json(json_output)
+    await emisor.send_json({
+        "type": "progress",
+        "etapa": "minado",
+        "message": "Noticias formateadas en JSON",
+        "progreso": 30
+    })
+
+    # Ejecutar el análisis de noticias
+    await emisor.send_json({"type": "status", "message": "Iniciando análisis de noticias"})
+
+    resultados, noticias_ids = await NewsProcessorService.process_news_batch(
+        db=db,
+        news_filepath=news_filepath,
+        dates=dates_rango,
+        rights=derechos,
+        emisor=emisor,
+        use_cache=use_cache
+    )
+
+    return {
+        "resultados": [r.dict() for r in resultados],
+        "noticias": noticias_ids
+    }
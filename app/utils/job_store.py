@@ -0,0 +1,97 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class JobStore:
+    """
+    Estado persistente de los trabajos del pipeline en un archivo SQLite: la
+    solicitud, el estado, el último progreso y el resultado final, para
+    consultarlos después de que el trabajo terminó o tras reiniciar el servidor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id_job TEXT PRIMARY KEY,
+                    estado TEXT NOT NULL,
+                    solicitud TEXT NOT NULL,
+                    progreso TEXT,
+                    final TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_estado ON jobs (estado)")
+            self._conn = conn
+        return self._conn
+
+    def save(self, job: Dict[str, Any]):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO jobs (id_job, estado, solicitud, progreso, final, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id_job"],
+                    job["estado"],
+                    json.dumps(job["solicitud"], ensure_ascii=False),
+                    _a_json(job.get("progreso")),
+                    _a_json(job.get("final")),
+                    job["created_at"],
+                    job["updated_at"]
+                )
+            )
+
+    def get(self, id_job: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id_job, estado, solicitud, progreso, final, created_at, updated_at FROM jobs WHERE id_job = ?",
+                (id_job,)
+            ).fetchone()
+        return _a_dict(row) if row else None
+
+    def list_by_estado(self, estados: List[str]) -> List[Dict[str, Any]]:
+        marcas = ",".join("?" for _ in estados)
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT id_job, estado, solicitud, progreso, final, created_at, updated_at FROM jobs "
+                f"WHERE estado IN ({marcas}) ORDER BY created_at",
+                tuple(estados)
+            ).fetchall()
+        return [_a_dict(row) for row in rows]
+
+    def purge_older_than(self, seconds: float, estados: List[str]) -> int:
+        """Elimina los trabajos en `estados` sin cambios hace más de `seconds`."""
+        marcas = ",".join("?" for _ in estados)
+        with self._lock:
+            cursor = self._connection().execute(
+                f"DELETE FROM jobs WHERE estado IN ({marcas}) AND updated_at < ?",
+                (*estados, time.time() - seconds)
+            )
+        return max(cursor.rowcount, 0)
+
+def _a_json(valor: Any) -> Optional[str]:
+    return json.dumps(valor, ensure_ascii=False) if valor is not None else None
+
+def _a_dict(row) -> Dict[str, Any]:
+    id_job, estado, solicitud, progreso, final, created_at, updated_at = row
+    return {
+        "id_job": id_job,
+        "estado": estado,
+        "solicitud": json.loads(solicitud),
+        "progreso": json.loads(progreso) if progreso else None,
+        "final": json.loads(final) if final else None,
+        "created_at": created_at,
+        "updated_at": updated_at
+    }
@@ -0,0 +1,92 @@
+import json
+from typing import Any, List, Optional
+
+class JsonArrayParser:
+    """
+    Parser incremental de un arreglo JSON de nivel superior que llega por partes
+    (p. ej. los fragmentos de una respuesta de Ollama en streaming).
+
+    Ignora el texto previo al arreglo (explicaciones, ```json) y toma como
+    inicio el primer "[" seguido de "{" o "]". `feed` retorna los elementos
+    que se completaron con ese fragmento, ya decodificados; `done` indica que
+    el arreglo se cerró, así que el resto de la generación sobra. Un elemento
+    que no es JSON válido lanza ValueError.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._en_arreglo = False
+        self._candidato = False
+        self._profundidad = 0
+        self._en_string = False
+        self._escape = False
+        self._elemento: List[str] = []
+
+    def feed(self, fragmento: str) -> List[Any]:
+        completados = []
+        for caracter in fragmento:
+            if self.done:
+                break
+            if not self._en_arreglo:
+                self._buscar_inicio(caracter)
+                continue
+            elemento = self._avanzar(caracter)
+            if elemento is not None:
+                completados.append(elemento)
+        return completados
+
+    def _buscar_inicio(self, caracter: str):
+        if self._candidato:
+            if caracter.isspace():
+                return
+            self._candidato = False
+            if caracter == "]":
+                self.done = True
+                return
+            if caracter == "{":
+                self._en_arreglo = True
+                self._avanzar(caracter)
+                return
+        if caracter == "[":
+            self._candidato = True
+
+    def _avanzar(self, caracter: str) -> Optional[Any]:
+        """Procesa un carácter dentro del arreglo; retorna un elemento si se completó."""
+        if self._en_string:
+            self._elemento.append(caracter)
+            if self._escape:
+                self._escape = False
+            elif caracter == "\\":
+                self._escape = True
+            elif caracter == '"':
+                self._en_string = False
+            return None
+
+        if self._profundidad == 0:
+            # Entre elementos del arreglo de nivel superior
+            if caracter.isspace() or caracter == ",":
+                return self._cerrar_elemento()
+            if caracter == "]":
+                elemento = self._cerrar_elemento()
+                self.done = True
+                return elemento
+
+        if caracter == '"':
+            self._en_string = True
+        elif caracter in "{[":
+            self._profundidad += 1
+        elif caracter in "}]":
+            self._profundidad -= 1
+            if self._profundidad < 0:
+                raise ValueError("JSON desbalanceado en la respuesta")
+        self._elemento.append(caracter)
+        if self._profundidad == 0 and caracter in "}]":
+            return self._cerrar_elemento()
+        return None
+
+    def _cerrar_elemento(self) -> Optional[Any]:
+        if not self._elemento:
+            return None
+        texto = "".join(self._elemento)
+        self._elemento = []
+        return json.loads(texto)
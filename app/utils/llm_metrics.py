@@ -0,0 +1,51 @@
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from app.core import config
+
+# Modo de generación: con JSON schema en `format` o libre (JSON pedido en el prompt)
+ESQUEMA = "esquema"
+LIBRE = "libre"
+
+_lock = threading.Lock()
+_contadores: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+    "generaciones": 0,
+    "desperdiciadas": 0,
+    "truncadas": 0,
+    "tokens_desperdiciados": 0
+})
+
+def registrar(etapa: str, modo: str, valida: bool, truncada: bool = False, tokens: Optional[int] = None):
+    """
+    Cuenta una generación del modelo. Las que no se pudieron interpretar son
+    desperdiciadas; `truncada` indica que se cortó por el tope de num_predict.
+    """
+    with _lock:
+        contador = _contadores[f"{etapa}:{modo}"]
+        contador["generaciones"] += 1
+        if truncada:
+            contador["truncadas"] += 1
+        if not valida:
+            contador["desperdiciadas"] += 1
+            contador["tokens_desperdiciados"] += tokens or 0
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            clave: {
+                **valores,
+                "tasa_desperdicio": round(valores["desperdiciadas"] / valores["generaciones"], 4)
+                if valores["generaciones"] else None
+            }
+            for clave, valores in _contadores.items()
+        }
+
+def reset():
+    with _lock:
+        _contadores.clear()
+
+def limite_tokens(caracteres_esperados: int) -> int:
+    """num_predict para una salida de aproximadamente `caracteres_esperados` caracteres."""
+    return math.ceil(caracteres_esperados / config.LLM_CHARS_PER_TOKEN * config.LLM_NUM_PREDICT_MARGIN) + 16
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+import httpx
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core import config
+from app.utils import ollama_helpers as OllamaHelpers
+
+_client: Optional[httpx.AsyncClient] = None
+
+# Una verificación exitosa de Ollama se reutiliza durante este intervalo (segundos)
+_VIGENCIA_VERIFICACION = 30.0
+_verificacion_lock = asyncio.Lock()
+_verificado_en: Optional[float] = None
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=config.OLLAMA_BASE_URL,
+        limits=httpx.Limits(
+            max_connections=config.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=config.OLLAMA_MAX_KEEPALIVE,
+            keepalive_expiry=config.OLLAMA_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(config.OLLAMA_TIMEOUT, connect=config.OLLAMA_CONNECT_TIMEOUT)
+    )
+
+async def start_client() -> httpx.AsyncClient:
+    """Crea el cliente compartido. Se llama una vez desde el lifespan de la app."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Devuelve el cliente compartido. Si la app no lo inició (scripts, consola)
+    se crea en el primer uso y se reutiliza igual.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+def _verificacion_vigente() -> bool:
+    return _verificado_en is not None and time.monotonic() - _verificado_en < _VIGENCIA_VERIFICACION
+
+async def ensure_ollama() -> bool:
+    """
+    Verifica que Ollama responda y lo inicia si hace falta. Las verificaciones
+    se hacen de a una (en paralelo cada una iniciaría su propio `ollama serve`)
+    y una exitosa se reutiliza durante _VIGENCIA_VERIFICACION segundos.
+    """
+    global _verificado_en
+    if _verificacion_vigente():
+        return True
+    async with _verificacion_lock:
+        if _verificacion_vigente():
+            return True
+        # La verificación usa sockets y sleep bloqueantes: se ejecuta fuera del event loop
+        disponible = await asyncio.to_thread(OllamaHelpers.verify_and_run_ollama)
+        _verificado_en = time.monotonic() if disponible else None
+        return disponible
+
+async def generate(payload: Dict[str, Any]) -> httpx.Response:
+    return await get_client().post("/api/generate", json=payload)
+
+async def generate_stream(payload: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    Fragmentos de texto de /api/generate a medida que el modelo los produce.
+    Si quien consume deja de iterar (y cierra el generador), la conexión se
+    cierra y Ollama deja de generar.
+    """
+    async with get_client().stream("POST", "/api/generate", json={**payload, "stream": True}) as response:
+        response.raise_for_status()
+        async for linea in response.aiter_lines():
+            if not linea.strip():
+                continue
+            parte = json.loads(linea)
+            if parte.get("response"):
+                yield parte["response"]
+            if parte.get("done"):
+                return
+
+async def chat(payload: Dict[str, Any]) -> Dict[str, Any]:
+    response = await get_client().post("/api/chat", json={**payload, "stream": False})
+    response.raise_for_status()
+    return response.json()
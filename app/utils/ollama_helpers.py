@@ -1,5 +1,6 @@
 import socket
 import subprocess
+import time
 
 from app.core import config
 
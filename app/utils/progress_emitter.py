@@ -0,0 +1,122 @@
+import asyncio
+from collections import OrderedDict, deque
+from itertools import count
+from typing import Callable, Optional, Set
+
+class Suscripcion:
+    """
+    Cola acotada de mensajes para un suscriptor. Si el suscriptor no consume a
+    tiempo se descartan los mensajes más viejos; `get` retorna None al cerrarse.
+    """
+
+    def __init__(self, max_size: int):
+        self._mensajes: deque = deque(maxlen=max_size)
+        self._hay_mensajes = asyncio.Event()
+        self._cerrada = False
+        self.descartados = 0
+
+    def put(self, mensaje: dict):
+        if len(self._mensajes) == self._mensajes.maxlen:
+            self.descartados += 1
+        self._mensajes.append(mensaje)
+        self._hay_mensajes.set()
+
+    def cerrar(self):
+        self._cerrada = True
+        self._hay_mensajes.set()
+
+    async def get(self) -> Optional[dict]:
+        while not self._mensajes:
+            if self._cerrada:
+                return None
+            self._hay_mensajes.clear()
+            await self._hay_mensajes.wait()
+        return self._mensajes.popleft()
+
+class ProgressEmitter:
+    """
+    Desacopla el reporte de progreso del procesamiento. `emit` solo guarda el
+    mensaje: de los de tipo "progress" se conserva el último por etapa y de los
+    "status" el último; el resto (errores, avisos) se envían todos. Una tarea
+    aparte los entrega a los suscriptores como máximo `max_rate` veces por
+    segundo, y `close` hace una entrega final garantizada.
+    """
+
+    def __init__(self, max_rate: float, queue_size: int, on_flush: Optional[Callable[[], None]] = None):
+        self.intervalo = 1 / max_rate
+        self.queue_size = queue_size
+        self.on_flush = on_flush
+        self.ultimo_progreso: Optional[dict] = None
+        self.final: Optional[dict] = None
+        self._pendientes: "OrderedDict[object, dict]" = OrderedDict()
+        self._suscriptores: Set[Suscripcion] = set()
+        self._secuencia = count()
+        self._hay_pendientes: Optional[asyncio.Event] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._cerrado = False
+
+    async def send_json(self, mensaje: dict):
+        # Misma interfaz que un WebSocket para usarlo como `emisor` del pipeline
+        self.emit(mensaje)
+
+    def emit(self, mensaje: dict):
+        if self._cerrado:
+            return
+        tipo = mensaje.get("type")
+        if tipo == "progress":
+            clave = ("progress", mensaje.get("etapa"))
+            self.ultimo_progreso = mensaje
+        elif tipo == "status":
+            clave = ("status",)
+        else:
+            clave = next(self._secuencia)
+        self._pendientes.pop(clave, None)
+        self._pendientes[clave] = mensaje
+
+        if self._tarea is None:
+            self._hay_pendientes = asyncio.Event()
+            self._tarea = asyncio.create_task(self._entregar_periodicamente())
+        self._hay_pendientes.set()
+
+    def subscribe(self) -> Suscripcion:
+        suscripcion = Suscripcion(self.queue_size)
+        if self._cerrado:
+            suscripcion.cerrar()
+        else:
+            self._suscriptores.add(suscripcion)
+        return suscripcion
+
+    def unsubscribe(self, suscripcion: Suscripcion):
+        self._suscriptores.discard(suscripcion)
+
+    async def close(self, final: Optional[dict] = None):
+        """Entrega lo pendiente y el mensaje final, y cierra las suscripciones."""
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+        self._entregar()
+        self._cerrado = True
+        self.final = final
+        for suscripcion in self._suscriptores:
+            if final is not None:
+                suscripcion.put(final)
+            suscripcion.cerrar()
+        self._suscriptores.clear()
+
+    async def _entregar_periodicamente(self):
+        while True:
+            await self._hay_pendientes.wait()
+            self._hay_pendientes.clear()
+            self._entregar()
+            await asyncio.sleep(self.intervalo)
+
+    def _entregar(self):
+        if not self._pendientes:
+            return
+        mensajes = list(self._pendientes.values())
+        self._pendientes.clear()
+        for suscripcion in self._suscriptores:
+            for mensaje in mensajes:
+                suscripcion.put(mensaje)
+        if self.on_flush:
+            self.on_flush()
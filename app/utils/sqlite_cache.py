@@ -0,0 +1,136 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class SQLiteCache:
+    """
+    Caché clave/valor persistente en un archivo SQLite.
+
+    Al superar `max_entries` o `max_bytes` se eliminan primero las entradas usadas
+    hace más tiempo (LRU); las entradas más viejas que `ttl_seconds` se tratan
+    como ausentes. Lleva contadores de aciertos, fallos y evicciones del proceso.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_accessed_at ON cache (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+            ahora = time.time()
+
+            if row and self.ttl_seconds is not None and ahora - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.evictions += 1
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (ahora, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        ahora = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, ahora, ahora)
+            )
+            self._evict(conn)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge(self) -> int:
+        """Elimina todas las entradas y retorna cuántas había."""
+        with self._lock:
+            conn = self._connection()
+            total = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            conn.execute("DELETE FROM cache")
+            conn.execute("VACUUM")
+            return total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        consultas = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / consultas, 4) if consultas else None,
+            "evictions": self.evictions
+        }
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self.ttl_seconds is not None:
+            cursor = conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self.evictions += max(cursor.rowcount, 0)
+
+        if self.max_entries is not None:
+            cursor = conn.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.evictions += max(cursor.rowcount, 0)
+
+        if self.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM cache ORDER BY accessed_at ASC").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    total -= size
+                    self.evictions += 1
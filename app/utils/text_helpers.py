@@ -0,0 +1,23 @@
+import re
+import hashlib
+import unicodedata
+from typing import List
+
+_PALABRA = re.compile(r"\w+")
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes ni diéresis ("Ahuachapán" -> "ahuachapan")."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+def tokenizar(texto: str) -> List[str]:
+    """Palabras normalizadas del texto, en orden; separa por todo lo que no sea \\w."""
+    return _PALABRA.findall(normalizar_texto(texto))
+
+def hash_titular(titular: str) -> str:
+    """
+    SHA-256 (hex, 64 caracteres) del titular normalizado: forma Unicode NFC,
+    espacios colapsados y sin distinguir mayúsculas. Clave indexable de News.
+    """
+    normalizado = " ".join(unicodedata.normalize("NFC", titular).split()).casefold()
+    return hashlib.sha256(normalizado.encode("utf-8")).hexdigest()
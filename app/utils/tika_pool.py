@@ -0,0 +1,116 @@
+import itertools
+import os
+import shlex
+import socket
+import subprocess
+import threading
+import time
+from typing import List
+
+from tika import tika as TikaLib
+
+from app.core import config
+from app.utils import logger as Logger
+
+logger = Logger.setup_logger()
+
+_procesos: List[subprocess.Popen] = []
+_endpoints: List[str] = []
+_ciclo = None
+_lock = threading.Lock()
+
+def _puerto_abierto(host: str, port: int) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+def _jar_path() -> str:
+    jar_path = os.path.join(TikaLib.TikaJarPath, "tika-server.jar")
+    if not os.path.isfile(jar_path):
+        TikaLib.getRemoteJar(TikaLib.TikaServerJar, jar_path)
+    return jar_path
+
+def _levantar_servidor(jar_path: str, host: str, port: int) -> subprocess.Popen:
+    cmd = [
+        TikaLib.TikaJava,
+        *shlex.split(TikaLib.TikaJavaArgs),
+        "-cp", jar_path,
+        "org.apache.tika.server.core.TikaServerCli",
+        "--host", host,
+        "--port", str(port)
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def start_pool(instancias: int = None) -> List[str]:
+    """
+    Levanta `instancias` servidores Tika en puertos consecutivos a partir de
+    config.TIKA_BASE_PORT. Si un puerto ya tiene un servidor, se reutiliza.
+    Es bloqueante (espera a que la JVM acepte conexiones): llamarlo en un hilo.
+    """
+    global _ciclo
+    instancias = instancias or config.TIKA_INSTANCES
+    host = config.TIKA_HOST
+
+    with _lock:
+        if _endpoints:
+            return list(_endpoints)
+
+        try:
+            jar_path = None
+            pendientes = []
+            for n in range(instancias):
+                port = config.TIKA_BASE_PORT + n
+                if not _puerto_abierto(host, port):
+                    jar_path = jar_path or _jar_path()
+                    _procesos.append(_levantar_servidor(jar_path, host, port))
+                pendientes.append(port)
+
+            limite = time.monotonic() + config.TIKA_STARTUP_TIMEOUT
+            while pendientes and time.monotonic() < limite:
+                pendientes = [p for p in pendientes if not _puerto_abierto(host, p)]
+                if pendientes:
+                    time.sleep(0.5)
+        except Exception as e:
+            logger.error(f"No se pudo levantar el pool de Tika: {str(e)}")
+            return []
+
+        for n in range(instancias):
+            port = config.TIKA_BASE_PORT + n
+            if port in pendientes:
+                logger.error(f"El servidor Tika del puerto {port} no respondió a tiempo")
+                continue
+            _endpoints.append(f"http://{host}:{port}")
+
+        if _endpoints:
+            # Los servidores ya están arriba: tika-python no debe intentar levantar otro
+            TikaLib.TikaClientOnly = True
+            _ciclo = itertools.cycle(_endpoints)
+            logger.info(f"Pool de Tika listo: {_endpoints}")
+
+        return list(_endpoints)
+
+def stop_pool():
+    global _ciclo
+    with _lock:
+        for proceso in _procesos:
+            proceso.terminate()
+        for proceso in _procesos:
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+        _procesos.clear()
+        _endpoints.clear()
+        _ciclo = None
+
+def next_endpoint() -> str:
+    """
+    Devuelve el siguiente servidor del pool (round-robin). Sin pool iniciado se
+    usa el endpoint por defecto de tika-python, que lo levanta bajo demanda.
+    """
+    with _lock:
+        if _ciclo is None:
+            return TikaLib.ServerEndpoint
+        return next(_ciclo)
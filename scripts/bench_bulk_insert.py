@@ -0,0 +1,107 @@
+"""
+Benchmark de escritura del pipeline de análisis: un objeto del ORM con flush por
+noticia (como antes) contra BulkWriter (executemany por tabla).
+
+Por cada noticia se escriben 1 News, 1 Analysis, N AnalysisDetail y la
+actualización de Analysis.content. Cada modo corre dentro de una transacción que
+se deshace al final, así que no deja datos.
+
+Uso, desde la raíz del repositorio:
+    python -m scripts.bench_bulk_insert                       # SQLite temporal
+    python -m scripts.bench_bulk_insert --url "mssql+pyodbc://...&TrustServerCertificate=yes"
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models.analysis import Analysis
+from app.models.analysis_detail import AnalysisDetail
+from app.models.base import Base
+from app.models.news import News
+from app.models.right import Right
+from app.repositories.bulk_writer import BulkWriter
+
+@compiles(UNIQUEIDENTIFIER, "sqlite")
+def _uniqueidentifier_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+def _filas(cantidad: int, id_right, detalles: int):
+    for i in range(cantidad):
+        news = News(
+            id_news=uuid4(), headline=f"Titular {i}", headline_hash=f"{i:064x}",
+            content="Contenido " * 50, news_date=datetime(2025, 1, 1)
+        )
+        analysis = Analysis(id_analysis=uuid4(), content="[]", analysis_date=datetime.now(), id_news=news.id_news)
+        details = [
+            AnalysisDetail(
+                id_detail=uuid4(), id_analysis=analysis.id_analysis, id_right=id_right,
+                count=1, places=json.dumps(["San Salvador"])
+            )
+            for _ in range(detalles)
+        ]
+        yield news, analysis, details
+
+def modo_orm(db, cantidad, id_right, detalles):
+    for news, analysis, details in _filas(cantidad, id_right, detalles):
+        db.add(news)
+        db.flush()
+        db.add(analysis)
+        db.flush()
+        db.add_all(details)
+        db.flush()
+        analysis.content = json.dumps([{"derecho": "x", "cantidad": 1, "lugares": []}])
+    db.flush()
+
+def modo_bulk(db, cantidad, id_right, detalles):
+    writer = BulkWriter(db)
+    for news, analysis, details in _filas(cantidad, id_right, detalles):
+        writer.add_all([news, analysis, *details])
+        writer.update(analysis, content=json.dumps([{"derecho": "x", "cantidad": 1, "lugares": []}]))
+    writer.flush()
+
+def medir(Session, modo, cantidad, detalles) -> float:
+    db = Session()
+    try:
+        right = Right(id_right=uuid4(), right=f"bench-{uuid4()}", order=0, visible=False)
+        db.add(right)
+        db.flush()
+        inicio = time.perf_counter()
+        modo(db, cantidad, right.id_right, detalles)
+        return time.perf_counter() - inicio
+    finally:
+        db.rollback()
+        db.close()
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__)
+    argumentos.add_argument("--url", help="URL de SQLAlchemy; por defecto un SQLite temporal")
+    argumentos.add_argument("--noticias", type=int, default=2000)
+    argumentos.add_argument("--detalles", type=int, default=3)
+    args = argumentos.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url, fast_executemany=args.url.startswith("mssql+pyodbc"))
+    else:
+        ruta = os.path.join(tempfile.mkdtemp(), "bench_bulk.sqlite")
+        engine = create_engine(f"sqlite:///{ruta}")
+        Base.metadata.create_all(engine)
+
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    filas = args.noticias * (3 + args.detalles)  # news + analysis + detalles + update
+
+    print(f"{engine.dialect.name}: {args.noticias} noticias, {filas} filas por modo")
+    for nombre, modo in (("ORM + flush por noticia", modo_orm), ("BulkWriter", modo_bulk)):
+        segundos = medir(Session, modo, args.noticias, args.detalles)
+        print(f"{nombre:25s} {segundos:8.2f}s  {filas / segundos:10.0f} filas/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark de get_candidates_locations contra la implementación anterior
+(una búsqueda con regex por distrito, recompilada en cada llamada).
+
+Uso, desde la raíz del repositorio:
+    python -m scripts.bench_locations [--iteraciones 200]
+"""
+import argparse
+import random
+import re
+import time
+from typing import List
+
+from app.data import locations as Locations
+from app.services import news_processor_service as NewsProcessorService
+
+def get_candidates_locations_anterior(noticia: str) -> List[str]:
+    ubicaciones = Locations.get_el_salvador_locations()
+    coincidencias = []
+
+    for ubicacion in ubicaciones:
+        valor = ubicacion["distrito"].lower()
+        if re.search(rf'\b{re.escape(valor)}\b', noticia):
+            coincidencias.append(ubicacion["distrito"])
+
+    return coincidencias
+
+def generar_noticias(cantidad: int, palabras_por_noticia: int = 500) -> List[str]:
+    random.seed(7)
+    distritos = [u["distrito"] for u in Locations.get_el_salvador_locations()]
+    relleno = "el la de en que los se por un para con una su al lo como más pero sus le ya o este".split()
+    noticias = []
+    for _ in range(cantidad):
+        palabras = [random.choice(relleno) for _ in range(palabras_por_noticia)]
+        for _ in range(5):
+            distrito = random.choice(distritos)
+            palabras.insert(random.randrange(len(palabras)), random.choice([distrito, distrito.lower(), distrito.upper()]))
+        noticias.append(" ".join(palabras))
+    return noticias
+
+def medir(funcion, noticias: List[str], iteraciones: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(iteraciones):
+        funcion(noticias[i % len(noticias)])
+    return (time.perf_counter() - inicio) / iteraciones
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__)
+    argumentos.add_argument("--iteraciones", type=int, default=200)
+    argumentos.add_argument("--noticias", type=int, default=50)
+    args = argumentos.parse_args()
+
+    noticias = generar_noticias(args.noticias)
+    anterior = medir(get_candidates_locations_anterior, noticias, args.iteraciones)
+    actual = medir(NewsProcessorService.get_candidates_locations, noticias, args.iteraciones)
+
+    encontrados_anterior = sum(len(get_candidates_locations_anterior(n)) for n in noticias)
+    encontrados_actual = sum(len(NewsProcessorService.get_candidates_locations(n)) for n in noticias)
+
+    print(f"Noticias de ~{len(noticias[0])} caracteres, {args.iteraciones} iteraciones")
+    print(f"Anterior: {anterior * 1e6:10.1f} µs/noticia  ({encontrados_anterior} distritos encontrados)")
+    print(f"Actual:   {actual * 1e6:10.1f} µs/noticia  ({encontrados_actual} distritos encontrados)")
+    print(f"Aceleración: x{anterior / actual:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Agrega la columna news.headline_hash, la completa para las filas existentes y
+crea el índice (headline_hash, news_date) usado para buscar noticias.
+
+Es idempotente: se puede volver a ejecutar y solo completa lo que falte.
+Debe correrse antes de desplegar la versión que busca noticias por hash;
+las filas sin hash no se encuentran y se volverían a crear.
+
+Uso, desde la raíz del repositorio:
+    python -m scripts.migrate_news_headline_hash [--batch-size 1000] [--dry-run]
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.utils import text_helpers as TextHelpers
+
+COLUMN_EXISTS = text("SELECT CASE WHEN COL_LENGTH('news', 'headline_hash') IS NULL THEN 0 ELSE 1 END")
+
+ADD_COLUMN = text("ALTER TABLE news ADD headline_hash NCHAR(64) NULL")
+
+CREATE_INDEX = text("""
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'ix_news_headline_hash_news_date' AND object_id = OBJECT_ID('news')
+)
+    CREATE INDEX ix_news_headline_hash_news_date ON news (headline_hash, news_date)
+""")
+
+SELECT_PENDING = text("""
+SELECT TOP (:batch_size) id_news, headline
+FROM news
+WHERE headline_hash IS NULL
+""")
+
+COUNT_PENDING = text("SELECT COUNT(*) FROM news WHERE headline_hash IS NULL")
+
+UPDATE_HASH = text("UPDATE news SET headline_hash = :headline_hash WHERE id_news = :id_news")
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__)
+    argumentos.add_argument("--batch-size", type=int, default=1000)
+    argumentos.add_argument("--dry-run", action="store_true", help="Solo informa cuántas filas faltan, sin modificar la base")
+    args = argumentos.parse_args()
+
+    with engine.connect() as conn:
+        existe = bool(conn.execute(COLUMN_EXISTS).scalar_one())
+
+    if args.dry_run:
+        # Sin escribir nada: ni la columna ni los hashes
+        if not existe:
+            print("Falta la columna news.headline_hash (se agregaría)")
+            return
+        with engine.connect() as conn:
+            pendientes = conn.execute(COUNT_PENDING).scalar_one()
+        print(f"Noticias sin headline_hash: {pendientes}")
+        return
+
+    if not existe:
+        with engine.begin() as conn:
+            conn.execute(ADD_COLUMN)
+        print("Columna news.headline_hash agregada")
+
+    with engine.connect() as conn:
+        pendientes = conn.execute(COUNT_PENDING).scalar_one()
+    print(f"Noticias sin headline_hash: {pendientes}")
+
+    actualizadas = 0
+    while True:
+        with engine.begin() as conn:
+            filas = conn.execute(SELECT_PENDING, {"batch_size": args.batch_size}).all()
+            if not filas:
+                break
+            conn.execute(UPDATE_HASH, [
+                {"id_news": fila.id_news, "headline_hash": TextHelpers.hash_titular(fila.headline)}
+                for fila in filas
+            ])
+        actualizadas += len(filas)
+        print(f"Actualizadas {actualizadas}/{pendientes}")
+
+    with engine.begin() as conn:
+        conn.execute(CREATE_INDEX)
+    print("Índice ix_news_headline_hash_news_date listo")
+
+if __name__ == "__main__":
+    main()
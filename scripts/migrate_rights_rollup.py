@@ -0,0 +1,71 @@
+"""
+Crea la tabla rights_daily_rollup y la completa desde analysis_detail.
+
+El pipeline de análisis la mantiene al guardar cada análisis; este script solo
+hace falta una vez (o para recalcular un rango si se corrigieron detalles a
+mano). Recalcular un rango reemplaza las filas de esas fechas, así que es
+idempotente.
+
+Uso, desde la raíz del repositorio:
+    python -m scripts.migrate_rights_rollup [--desde 2025-01-01] [--hasta 2025-12-31] [--dias-por-lote 31]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, text
+
+from app.database import SessionLocal, engine
+from app.models.news import News
+from app.repositories import rollup_repository as RollupRepository
+
+CREATE_TABLE = text("""
+IF OBJECT_ID('rights_daily_rollup') IS NULL
+    CREATE TABLE rights_daily_rollup (
+        rollup_date DATE NOT NULL,
+        id_right UNIQUEIDENTIFIER NOT NULL REFERENCES [right] (id_right),
+        count INT NOT NULL DEFAULT 0,
+        places NVARCHAR(MAX) NOT NULL DEFAULT '[]',
+        updated_at DATETIME NOT NULL,
+        CONSTRAINT pk_rights_daily_rollup PRIMARY KEY (rollup_date, id_right)
+    )
+""")
+
+def _fecha(valor: str) -> date:
+    return datetime.strptime(valor, "%Y-%m-%d").date()
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__)
+    argumentos.add_argument("--desde", type=_fecha, help="Primera fecha (YYYY-MM-DD); por defecto la noticia más antigua")
+    argumentos.add_argument("--hasta", type=_fecha, help="Última fecha (YYYY-MM-DD); por defecto la noticia más reciente")
+    argumentos.add_argument("--dias-por-lote", type=int, default=31)
+    args = argumentos.parse_args()
+
+    with engine.begin() as conn:
+        conn.execute(CREATE_TABLE)
+
+    db = SessionLocal()
+    try:
+        if args.desde is None or args.hasta is None:
+            minima, maxima = db.query(func.min(News.news_date), func.max(News.news_date)).one()
+            if minima is None:
+                print("No hay noticias; tabla creada vacía")
+                return
+            args.desde = args.desde or minima.date()
+            args.hasta = args.hasta or maxima.date()
+
+        inicio = args.desde
+        total = 0
+        while inicio <= args.hasta:
+            fin = min(args.hasta, inicio + timedelta(days=args.dias_por_lote - 1))
+            escritas = RollupRepository.reconstruir_rollup(db, inicio, fin)
+            db.commit()
+            total += escritas
+            print(f"{inicio} a {fin}: {escritas} filas")
+            inicio = fin + timedelta(days=1)
+
+        print(f"Rollup listo: {total} filas")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
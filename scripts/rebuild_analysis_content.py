@@ -0,0 +1,74 @@
+"""
+Reconciliación de analysis.content con analysis_detail.
+
+El pipeline mantiene analysis.content en memoria (content previo + ítems nuevos)
+sin releer los detalles. Este comando lo recalcula desde analysis_detail y
+corrige solo los análisis cuyo contenido difiere, por ejemplo tras editar
+detalles a mano o si una corrida se interrumpió a medias.
+
+Uso, desde la raíz del repositorio:
+    python -m scripts.rebuild_analysis_content [--desde 2025-01-01] [--hasta 2025-01-31] [--dry-run]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models.analysis import Analysis
+from app.repositories.bulk_writer import BulkWriter
+from app.services import news_processor_service as NewsProcessorService
+
+def _normalizar(content: str):
+    try:
+        items = json.loads(content) if content else []
+    except json.JSONDecodeError:
+        return None
+    return sorted(json.dumps(item, ensure_ascii=False, sort_keys=True) for item in items)
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__)
+    argumentos.add_argument("--desde", help="Fecha de análisis inicial (YYYY-MM-DD)")
+    argumentos.add_argument("--hasta", help="Fecha de análisis final, inclusive (YYYY-MM-DD)")
+    argumentos.add_argument("--batch-size", type=int, default=500)
+    argumentos.add_argument("--dry-run", action="store_true", help="Solo informa las diferencias")
+    args = argumentos.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(Analysis.id_analysis).order_by(Analysis.id_analysis)
+        if args.desde:
+            query = query.filter(Analysis.analysis_date >= datetime.strptime(args.desde, "%Y-%m-%d"))
+        if args.hasta:
+            query = query.filter(Analysis.analysis_date < datetime.strptime(args.hasta, "%Y-%m-%d") + timedelta(days=1))
+        # Primero solo los ids: pyodbc no admite otra consulta con un cursor abierto (sin MARS)
+        ids = [fila.id_analysis for fila in query.all()]
+
+        writer = BulkWriter(db, batch_size=args.batch_size)
+        revisados = corregidos = 0
+        for inicio in range(0, len(ids), args.batch_size):
+            bloque = ids[inicio:inicio + args.batch_size]
+            analisis = db.query(Analysis).filter(Analysis.id_analysis.in_(bloque)).all()
+            contenidos = NewsProcessorService.build_analysis_contents_from_details(
+                db, [a.id_analysis for a in analisis]
+            )
+            for analysis in analisis:
+                revisados += 1
+                esperado = contenidos[analysis.id_analysis]
+                if _normalizar(analysis.content) == _normalizar(esperado):
+                    continue
+                corregidos += 1
+                print(f"{analysis.id_analysis}: content difiere de los detalles")
+                if not args.dry_run:
+                    writer.update(analysis, content=esperado)
+
+        if args.dry_run:
+            db.rollback()
+        else:
+            writer.flush()
+            db.commit()
+        print(f"Revisados {revisados}, {'con diferencias' if args.dry_run else 'corregidos'} {corregidos}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
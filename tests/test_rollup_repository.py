@@ -0,0 +1,79 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import analysis, analysis_detail, news, right  # noqa: F401  (tablas relacionadas)
+from app.models.base import Base
+from app.models.rights_rollup import RightsDailyRollup
+from app.repositories import rollup_repository as RollupRepository
+
+@compiles(UNIQUEIDENTIFIER, "sqlite")
+def _uniqueidentifier_sqlite(tipo, compilador, **kw):
+    return "CHAR(32)"
+
+FECHA = date(2025, 5, 1)
+
+@pytest.fixture
+def sesiones(tmp_path):
+    # Archivo (no :memory:) para que cada sesión tenga su propia conexión
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollup.db'}")
+    Base.metadata.create_all(engine)
+    fabrica = sessionmaker(bind=engine, autoflush=False)
+    yield fabrica
+    engine.dispose()
+
+def _deltas(id_right, cantidad, lugares):
+    deltas = RollupRepository.nuevos_deltas()
+    RollupRepository.agregar_delta(deltas, FECHA, id_right, cantidad, lugares)
+    return deltas
+
+def test_aplicar_deltas_suma_sobre_filas_existentes(sesiones):
+    id_right = uuid4()
+    with sesiones() as db:
+        RollupRepository.aplicar_deltas(db, _deltas(id_right, 2, ["Ilobasco"]))
+        db.commit()
+    with sesiones() as db:
+        RollupRepository.aplicar_deltas(db, _deltas(id_right, 3, ["Tacuba"]))
+        db.commit()
+
+    with sesiones() as db:
+        fila = db.get(RightsDailyRollup, (FECHA, id_right))
+        assert fila.count == 5
+        assert json.loads(fila.places) == ["Ilobasco", "Tacuba"]
+
+def test_aplicar_deltas_dos_sesiones_crean_la_misma_fila(sesiones):
+    id_right = uuid4()
+    otro_right = uuid4()
+    db_a = sesiones()
+    db_b = sesiones()
+
+    # La sesión A crea la fila justo después de que B leyó las existentes (sin encontrarla)
+    @event.listens_for(db_b, "do_orm_execute")
+    def _carrera(estado):
+        if not estado.is_select or db_a.info.get("confirmada"):
+            return None
+        resultado = estado.invoke_statement().freeze()
+        RollupRepository.aplicar_deltas(db_a, _deltas(id_right, 2, ["Ilobasco"]))
+        db_a.commit()
+        db_a.info["confirmada"] = True
+        return resultado()
+
+    deltas_b = _deltas(id_right, 3, ["Tacuba"])
+    RollupRepository.agregar_delta(deltas_b, FECHA, otro_right, 1, [])
+    RollupRepository.aplicar_deltas(db_b, deltas_b)
+    db_b.commit()
+    db_a.close()
+    db_b.close()
+
+    with sesiones() as db:
+        fila = db.get(RightsDailyRollup, (FECHA, id_right))
+        assert fila.count == 5
+        assert json.loads(fila.places) == ["Ilobasco", "Tacuba"]
+        # El resto del lote de B no se pierde
+        assert db.get(RightsDailyRollup, (FECHA, otro_right)).count == 1